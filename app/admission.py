@@ -0,0 +1,81 @@
+"""
+Admission Control for School Hackathon
+In-memory token buckets per IP and per user plus a concurrency cap for DB-heavy routes.
+Compatible with Python 3.10+
+"""
+import math
+import threading
+import time
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self, now=None):
+        """Take one token. Returns 0 on success, else seconds until a token is available."""
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    def __init__(self, ip_rate=5.0, ip_burst=20, user_rate=3.0, user_burst=10,
+                 max_concurrent=8, queue_timeout=2.0, idle_ttl=300):
+        self.ip_rate = ip_rate
+        self.ip_burst = ip_burst
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.queue_timeout = queue_timeout
+        self.idle_ttl = idle_ttl
+        self.lock = threading.Lock()
+        self.ip_buckets = {}
+        self.user_buckets = {}
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+        self._last_prune = time.monotonic()
+        self.rejected = 0
+
+    def _bucket(self, buckets, key, rate, capacity):
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = TokenBucket(rate, capacity)
+        return bucket
+
+    def _prune(self, now):
+        # Full buckets that have been idle are equivalent to fresh ones; drop them
+        if now - self._last_prune < self.idle_ttl:
+            return
+        self._last_prune = now
+        for buckets in (self.ip_buckets, self.user_buckets):
+            for key in [k for k, b in buckets.items() if now - b.updated > self.idle_ttl]:
+                del buckets[key]
+
+    def check_rate(self, ip, user=None):
+        """Return 0 if the request may proceed, else a Retry-After value in whole seconds."""
+        now = time.monotonic()
+        with self.lock:
+            self._prune(now)
+            wait = self._bucket(self.ip_buckets, ip, self.ip_rate, self.ip_burst).take(now)
+            if not wait and user is not None:
+                wait = self._bucket(self.user_buckets, user, self.user_rate, self.user_burst).take(now)
+            if wait:
+                self.rejected += 1
+        return math.ceil(wait) if wait else 0
+
+    def acquire_slot(self):
+        """Wait briefly for a DB-heavy request slot. Returns False if the server is saturated."""
+        if self.slots.acquire(timeout=self.queue_timeout):
+            return True
+        with self.lock:
+            self.rejected += 1
+        return False
+
+    def release_slot(self):
+        self.slots.release()
@@ -0,0 +1,172 @@
+"""
+Error Feed for School Hackathon
+Groups repeated errors, keeps a bounded recent list and pushes coalesced updates to admins.
+Compatible with Python 3.10+
+"""
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+
+# Volatile bits that make otherwise identical tracebacks look different
+_VOLATILE_PATTERNS = [
+    (re.compile(r'0x[0-9a-fA-F]+'), '0x?'),
+    (re.compile(r'line \d+'), 'line ?'),
+    (re.compile(r'\d+(\.\d+)?'), '?'),
+]
+
+
+def fingerprint(message):
+    """Return a stable fingerprint for an error message or traceback."""
+    text = message.strip()
+    lines = text.splitlines()
+    # Tracebacks: the frame locations plus the exception type identify the error
+    if lines and lines[0].startswith('Traceback'):
+        frames = [l.strip() for l in lines if l.strip().startswith('File ')]
+        exc_type = lines[-1].split(':', 1)[0]
+        text = '\n'.join(frames + [exc_type])
+    for pattern, repl in _VOLATILE_PATTERNS:
+        text = pattern.sub(repl, text)
+    return hashlib.sha1(text.encode('utf-8', 'replace')).hexdigest()[:16]
+
+
+class ErrorFeedHandler(logging.Handler):
+    """Forwards every ERROR record, from any module's logging.error, into the feed."""
+
+    def __init__(self, feed, level=logging.ERROR):
+        super().__init__(level)
+        self.feed = feed
+
+    def emit(self, record):
+        # A record can reach this handler twice when a logger shares the root's handler list
+        if getattr(record, 'error_feed_seen', False):
+            return
+        record.error_feed_seen = True
+        try:
+            message = record.getMessage()
+            if record.exc_info:
+                message += '\n' + logging.Formatter().formatException(record.exc_info)
+            self.feed.record(message)
+        except Exception:
+            self.handleError(record)
+
+
+class ErrorFeed:
+    def __init__(self, db_path, emit=None, max_recent=10, min_interval=2.0):
+        self.db_path = db_path
+        self.emit = emit
+        self.min_interval = min_interval
+        self.lock = threading.Lock()
+        # fingerprint -> group dict; recent holds fingerprints, newest last
+        self.groups = {}
+        self.recent = deque(maxlen=max_recent)
+        # fingerprint -> occurrences not yet written to the database
+        self._pending = {}
+        self._wakeup = threading.Event()
+        self._init_db()
+        self._thread = threading.Thread(target=self._run, name='error-feed', daemon=True)
+        self._thread.start()
+
+    def _init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            c = conn.cursor()
+            c.execute('''CREATE TABLE IF NOT EXISTS error_groups (
+                fingerprint TEXT PRIMARY KEY,
+                message TEXT,
+                count INTEGER DEFAULT 0,
+                first_seen REAL,
+                last_seen REAL
+            )''')
+            c.execute('CREATE INDEX IF NOT EXISTS idx_error_groups_last_seen ON error_groups (last_seen)')
+            conn.commit()
+
+    def record(self, message):
+        """Record an error. Never blocks on I/O; the emitter thread does the rest."""
+        fp = fingerprint(message)
+        now = time.time()
+        with self.lock:
+            group = self.groups.get(fp)
+            if group is None:
+                group = {'fingerprint': fp, 'message': message, 'count': 0, 'first_seen': now, 'last_seen': now}
+                self.groups[fp] = group
+            group['count'] += 1
+            group['last_seen'] = now
+            # Move to the newest slot of the ring buffer
+            if fp in self.recent:
+                self.recent.remove(fp)
+            elif len(self.recent) == self.recent.maxlen:
+                # Forget the in-memory copy of the group falling off the end; it is persisted
+                evicted = self.recent[0]
+                if evicted not in self._pending:
+                    self.groups.pop(evicted, None)
+            self.recent.append(fp)
+            self._pending[fp] = self._pending.get(fp, 0) + 1
+        self._wakeup.set()
+        return fp
+
+    def get_recent(self):
+        """Return the most recent error groups, newest first."""
+        with self.lock:
+            return [dict(self.groups[fp]) for fp in reversed(self.recent) if fp in self.groups]
+
+    def clear(self):
+        """Empty the recent list shown to admins. Persisted groups are kept."""
+        with self.lock:
+            self.recent.clear()
+        self._wakeup.set()
+
+    def query(self, limit=200):
+        """Return persisted error groups ordered by most recent occurrence."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            c = conn.cursor()
+            c.execute('''SELECT fingerprint, message, count, first_seen, last_seen
+                         FROM error_groups ORDER BY last_seen DESC LIMIT ?''', (limit,))
+            return [dict(row) for row in c.fetchall()]
+
+    def flush(self):
+        """Persist pending occurrences and push one update to admins."""
+        with self.lock:
+            dirty = [dict(self.groups[fp], delta=delta) for fp, delta in self._pending.items() if fp in self.groups]
+            self._pending.clear()
+            # Drop groups that were only kept around until persisted
+            for fp in list(self.groups):
+                if fp not in self.recent:
+                    del self.groups[fp]
+        if dirty:
+            try:
+                with sqlite3.connect(self.db_path, timeout=5) as conn:
+                    conn.executemany('''
+                        INSERT INTO error_groups (fingerprint, message, count, first_seen, last_seen)
+                        VALUES (:fingerprint, :message, :delta, :first_seen, :last_seen)
+                        ON CONFLICT(fingerprint) DO UPDATE SET
+                            message = excluded.message,
+                            count = error_groups.count + excluded.count,
+                            last_seen = excluded.last_seen
+                    ''', dirty)
+                    conn.commit()
+            except sqlite3.Error:
+                # Keep the occurrences pending so the next flush retries
+                with self.lock:
+                    for group in dirty:
+                        fp = group['fingerprint']
+                        delta = group.pop('delta')
+                        self.groups.setdefault(fp, group)
+                        self._pending[fp] = self._pending.get(fp, 0) + delta
+                self._wakeup.set()
+        if self.emit:
+            try:
+                self.emit(self.get_recent())
+            except Exception:
+                pass
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            self.flush()
+            # Coalesce bursts: at most one update per min_interval
+            time.sleep(self.min_interval)
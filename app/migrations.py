@@ -0,0 +1,147 @@
+"""
+Schema Migrations for School Hackathon
+Versioned, ordered migrations for submissions.db and a query-plan regression check.
+Compatible with Python 3.10+
+
+Usage: python app/migrations.py --check
+"""
+import re
+import sqlite3
+import sys
+import time
+
+
+def _add_last_leave_ts(c):
+    # Older databases created student_metrics without the debounce timestamp
+    columns = [row[1] for row in c.execute("PRAGMA table_info(student_metrics)")]
+    if 'last_leave_ts' not in columns:
+        c.execute("ALTER TABLE student_metrics ADD COLUMN last_leave_ts REAL DEFAULT 0")
+
+
+# (version, description, list of SQL statements or a callable taking a cursor)
+MIGRATIONS = [
+    (1, 'create submissions and student_metrics', [
+        '''CREATE TABLE IF NOT EXISTS submissions (
+            username TEXT,
+            question TEXT,
+            submitted INTEGER,
+            start_time REAL,
+            PRIMARY KEY (username, question)
+        )''',
+        '''CREATE TABLE IF NOT EXISTS student_metrics (
+            username TEXT PRIMARY KEY,
+            leave_count INTEGER DEFAULT 0
+        )''',
+    ]),
+    (2, 'add student_metrics.last_leave_ts', _add_last_leave_ts),
+    (3, 'covering indexes for progress, rollup and started-user queries', [
+        # Single-column indexes from an earlier draft; superseded by the covering ones below
+        'DROP INDEX IF EXISTS idx_username',
+        'DROP INDEX IF EXISTS idx_question',
+        # Per-user progress: lookups by (username, question) and per-user listings
+        'CREATE INDEX IF NOT EXISTS idx_submissions_progress ON submissions (username, question, submitted, start_time)',
+        # Admin rollup ordered by question
+        'CREATE INDEX IF NOT EXISTS idx_submissions_rollup ON submissions (question, username, submitted)',
+        # Started-user count: range on start_time, DISTINCT username read from the index
+        'CREATE INDEX IF NOT EXISTS idx_submissions_started ON submissions (start_time, username)',
+        # Leave-count listing reads only these two columns
+        'CREATE INDEX IF NOT EXISTS idx_student_metrics_counts ON student_metrics (username, leave_count)',
+    ]),
+    (4, 'create student_events for batched focus/visibility telemetry', [
+        '''CREATE TABLE IF NOT EXISTS student_events (
+            username TEXT,
+            event TEXT,
+            question TEXT,
+            ts REAL
+        )''',
+        'CREATE INDEX IF NOT EXISTS idx_student_events_user_ts ON student_events (username, ts)',
+    ]),
+    (5, 'drop idx_student_metrics_counts', [
+        # Duplicated a tiny table and cost an index write on every leave-count update;
+        # leave_counts is an intentional full read (QuestionManager.FULL_SCAN_QUERIES)
+        'DROP INDEX IF EXISTS idx_student_metrics_counts',
+    ]),
+]
+
+
+def current_version(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        description TEXT,
+        applied_at REAL
+    )''')
+    row = conn.execute('SELECT MAX(version) FROM schema_version').fetchone()
+    return row[0] or 0
+
+
+def migrate(conn):
+    """Apply every pending migration in order, each in its own transaction.
+
+    sqlite3 does not open a transaction before DDL by itself, so each migration starts with an
+    explicit BEGIN; a failing step rolls back the whole migration, not just its last statement.
+    """
+    version = current_version(conn)
+    conn.commit()
+    for number, description, steps in MIGRATIONS:
+        if number <= version:
+            continue
+        c = conn.cursor()
+        c.execute('BEGIN')
+        try:
+            if callable(steps):
+                steps(c)
+            else:
+                for sql in steps:
+                    c.execute(sql)
+            c.execute('INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)',
+                      (number, description, time.time()))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return MIGRATIONS[-1][0]
+
+
+# Reading every row: "SCAN submissions" (or "SCAN TABLE submissions" on older SQLite), including
+# a walk of a whole (covering) index, which is still proportional to the table
+_FULL_SCAN = re.compile(r'^SCAN (TABLE )?\w+( AS \w+)?( USING (COVERING )?INDEX \w+)?$')
+
+
+def explain(conn, sql):
+    params = (None,) * sql.count('?')
+    return [row[-1] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params)]
+
+
+def check_query_plans(conn, queries, allow_full_scan=()):
+    """Return {name: plan} for every query whose plan contains a full table scan.
+
+    allow_full_scan names queries that read a whole table on purpose.
+    """
+    failures = {}
+    for name, sql in queries.items():
+        plan = explain(conn, sql)
+        if name not in allow_full_scan and any(_FULL_SCAN.match(step) for step in plan):
+            failures[name] = plan
+    return failures
+
+
+if __name__ == '__main__':
+    import os
+    import tempfile
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from question_manager import QuestionManager
+
+    if '--check' not in sys.argv:
+        print(__doc__.strip())
+        sys.exit(2)
+    with tempfile.TemporaryDirectory() as tmp:
+        with sqlite3.connect(os.path.join(tmp, 'check.db')) as conn:
+            migrate(conn)
+            failures = check_query_plans(conn, QuestionManager.QUERIES, QuestionManager.FULL_SCAN_QUERIES)
+            for name, sql in QuestionManager.QUERIES.items():
+                if name in failures:
+                    status = 'FULL SCAN'
+                else:
+                    status = 'ok (scan)' if name in QuestionManager.FULL_SCAN_QUERIES else 'ok'
+                print(f"{status:9} {name}: {' | '.join(explain(conn, sql))}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,165 @@
+"""
+Sampling Profiler for School Hackathon
+Samples every thread's stack with sys._current_frames() for a bounded window and saves
+collapsed stacks under app/logs/profiles. Nothing runs while no capture is active.
+Compatible with Python 3.10+
+"""
+import html
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime
+
+MAX_DURATION = 120
+MAX_RATE = 1000
+# "Thread-12 (process_request_thread)", "ThreadPoolExecutor-0_3": one root per kind of thread
+_THREAD_NUMBER = re.compile(r'[-_]?\d+')
+
+
+def _thread_root(name):
+    return f"thread:{_THREAD_NUMBER.sub('', name) if name else 'unknown'}"
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class SamplingProfiler:
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.lock = threading.Lock()
+        self.status = {'running': False}
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def start(self, duration=10.0, rate=100):
+        """Start a capture in the background. Returns the capture name, or None if one is running."""
+        duration = min(max(float(duration), 0.5), MAX_DURATION)
+        rate = min(max(int(rate), 1), MAX_RATE)
+        with self.lock:
+            if self.status['running']:
+                return None
+            name = datetime.now().strftime('profile-%Y%m%d-%H%M%S')
+            self.status = {'running': True, 'name': name, 'duration': duration, 'rate': rate,
+                           'started': time.time(), 'samples': 0}
+        threading.Thread(target=self._capture, args=(name, duration, rate), name='profiler', daemon=True).start()
+        return name
+
+    def get_status(self):
+        with self.lock:
+            return dict(self.status)
+
+    def _capture(self, name, duration, rate):
+        me = threading.get_ident()
+        interval = 1.0 / rate
+        stacks = {}
+        samples = 0
+        error = None
+        try:
+            deadline = time.monotonic() + duration
+            while time.monotonic() < deadline:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == me:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        stack.append(_frame_name(frame))
+                        frame = frame.f_back
+                    stack.append(_thread_root(names.get(ident)))
+                    key = ';'.join(reversed(stack))
+                    stacks[key] = stacks.get(key, 0) + 1
+                samples += 1
+                time.sleep(interval)
+            path = os.path.join(self.output_dir, f"{name}.collapsed")
+            with open(path, 'w', encoding='utf-8') as f:
+                for stack, count in sorted(stacks.items()):
+                    f.write(f"{stack} {count}\n")
+        except Exception as e:
+            error = str(e)
+            logging.error(f"Profiler capture {name} failed: {e}")
+        finally:
+            # Always clear the flag, or a failed capture would block every later one
+            with self.lock:
+                self.status.update(running=False, samples=samples, error=error)
+
+    def list_captures(self):
+        names = [f[:-len('.collapsed')] for f in os.listdir(self.output_dir) if f.endswith('.collapsed')]
+        return sorted(names, reverse=True)
+
+    def load(self, name):
+        """Return {collapsed stack: count} for a saved capture, or None if it does not exist."""
+        path = os.path.join(self.output_dir, f"{name}.collapsed")
+        if not os.path.exists(path):
+            return None
+        stacks = {}
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                stack, _, count = line.rstrip('\n').rpartition(' ')
+                if stack:
+                    stacks[stack] = stacks.get(stack, 0) + int(count)
+        return stacks
+
+
+def top_functions(stacks, n=20):
+    """Return [(function, self_samples, total_samples)] sorted by self samples."""
+    own, total = {}, {}
+    for stack, count in stacks.items():
+        frames = stack.split(';')[1:]   # drop the thread:<name> root
+        if not frames:
+            continue
+        own[frames[-1]] = own.get(frames[-1], 0) + count
+        for frame in set(frames):
+            total[frame] = total.get(frame, 0) + count
+    rows = [(func, own.get(func, 0), total[func]) for func in total]
+    rows.sort(key=lambda r: (r[1], r[2]), reverse=True)
+    return rows[:n]
+
+
+def render_flamegraph(stacks, width=1100, row_height=16):
+    """Render collapsed stacks as an inline SVG flame graph (root at the bottom)."""
+    root = {'count': 0, 'children': {}}
+    for stack, count in stacks.items():
+        root['count'] += count
+        node = root
+        for frame in stack.split(';'):
+            node = node['children'].setdefault(frame, {'count': 0, 'children': {}})
+            node['count'] += count
+    if not root['count']:
+        return ''
+
+    rects = []
+    depth_max = [0]
+
+    def layout(node, x, depth):
+        depth_max[0] = max(depth_max[0], depth)
+        for frame, child in sorted(node['children'].items()):
+            w = child['count'] / root['count'] * width
+            if w >= 0.5:
+                rects.append((x, depth, w, frame, child['count']))
+                layout(child, x, depth + 1)
+            x += w
+
+    layout(root, 0.0, 0)
+    height = (depth_max[0] + 1) * row_height
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+             f'style="font-family:monospace;font-size:11px;background:#fff;">']
+    for x, depth, w, frame, count in rects:
+        y = height - (depth + 1) * row_height
+        # Stable warm colour per function name
+        hue = zlib.crc32(frame.encode('utf-8')) % 60
+        label = html.escape(frame)
+        pct = count / root['count'] * 100
+        parts.append(f'<g><title>{label} ({count} samples, {pct:.1f}%)</title>'
+                     f'<rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{row_height - 1}" fill="hsl({hue},85%,60%)"/>')
+        if w > 40:
+            chars = int(w / 7)
+            text = label if len(frame) <= chars else html.escape(frame[:max(chars - 2, 1)]) + '..'
+            parts.append(f'<text x="{x + 3:.1f}" y="{y + row_height - 4}" fill="#000">{text}</text>')
+        parts.append('</g>')
+    parts.append('</svg>')
+    return ''.join(parts)
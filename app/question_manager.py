@@ -8,17 +8,54 @@ import json
 import time
 from threading import Lock
 import logging
+from migrations import migrate
 
 # Initialize logging
 logging.basicConfig(filename='app/logs/errors.log', level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class QuestionManager:
+    # Every query issued against submissions.db; `python app/migrations.py --check`
+    # runs EXPLAIN QUERY PLAN on each of these and fails on a full table scan.
+    QUERIES = {
+        'start_time': "SELECT start_time FROM submissions WHERE username=? AND question=?",
+        'insert_start': "INSERT INTO submissions (username, question, submitted, start_time) VALUES (?, ?, 0, ?)",
+        'submitted': "SELECT submitted FROM submissions WHERE username=? AND question=?",
+        'submit': """
+            INSERT OR REPLACE INTO submissions
+            (username, question, submitted, start_time)
+            VALUES (?, ?, 1, COALESCE(
+                (SELECT start_time FROM submissions WHERE username=? AND question=?),
+                ?
+            ))
+        """,
+        'user_progress': "SELECT question, submitted, start_time FROM submissions WHERE username=?",
+        'has_started': "SELECT COUNT(*) FROM submissions WHERE username=?",
+        'rollup': "SELECT username, question, submitted FROM submissions ORDER BY question, username",
+        'started_users': "SELECT COUNT(DISTINCT username) FROM submissions WHERE start_time IS NOT NULL",
+        'reset': "DELETE FROM submissions",
+        'ensure_metrics': "INSERT OR IGNORE INTO student_metrics (username, leave_count, last_leave_ts) VALUES (?, 0, 0)",
+        'last_leave_ts': "SELECT last_leave_ts FROM student_metrics WHERE username = ?",
+        'count_leave': "UPDATE student_metrics SET leave_count = leave_count + 1, last_leave_ts = ? WHERE username = ?",
+        'touch_leave': "UPDATE student_metrics SET last_leave_ts = ? WHERE username = ?",
+        'leave_counts': "SELECT username, leave_count FROM student_metrics",
+        'add_leaves': "UPDATE student_metrics SET leave_count = leave_count + ?, last_leave_ts = ? WHERE username = ?",
+        'insert_event': "INSERT INTO student_events (username, event, question, ts) VALUES (?, ?, ?, ?)",
+    }
+
+    # Queries that read every row on purpose; the plan check in migrations.py allows their scans
+    FULL_SCAN_QUERIES = {'rollup', 'leave_counts'}
+
+    # Telemetry events that count as leaving the exam page
+    LEAVE_EVENTS = {'blur', 'hidden', 'unload'}
+
     def __init__(self, questions_dir, submissions_dir, logins_path, db_path):
         self.questions_dir = questions_dir
         self.submissions_dir = submissions_dir
         self.logins_path = logins_path
         self.db_path = db_path
         self.lock = Lock()
+        # Bumped under self.lock by the session store each time a new DB/submissions tree is swapped in
+        self.generation = 0
         self.timers = {
             "question1": 20,   # 20 seconds (changed for testing)
             "question2": 900,  # 15 min
@@ -33,29 +70,12 @@ class QuestionManager:
         with open(self.logins_path, 'r') as f:
             self.logins = json.load(f)
 
-    def _init_db(self):
+    def _init_db(self, db_path=None):
+        # db_path lets the session store prepare a fresh database before swapping it in
         import sqlite3
-        with sqlite3.connect(self.db_path) as conn:
-            c = conn.cursor()
-            c.execute('''CREATE TABLE IF NOT EXISTS submissions (
-                username TEXT,
-                question TEXT,
-                submitted INTEGER,
-                start_time REAL,
-                PRIMARY KEY (username, question)
-            )''')
-            # Table for student metrics such as leave counts
-            c.execute('''CREATE TABLE IF NOT EXISTS student_metrics (
-                username TEXT PRIMARY KEY,
-                leave_count INTEGER DEFAULT 0
-            )''')
-            # Add a column to store the last leave timestamp (to debounce rapid events)
-            try:
-                c.execute("ALTER TABLE student_metrics ADD COLUMN last_leave_ts REAL DEFAULT 0")
-            except Exception:
-                # SQLite will raise if the column already exists; ignore
-                pass
-            conn.commit()
+        with sqlite3.connect(db_path or self.db_path) as conn:
+            # Tables, columns and indexes are managed by versioned migrations
+            migrate(conn)
 
     def get_question_text(self, qname):
         qpath = os.path.join(self.questions_dir, f"{qname}.txt")
@@ -68,17 +88,17 @@ class QuestionManager:
         import sqlite3, time
         with self.lock, sqlite3.connect(self.db_path) as conn:
             c = conn.cursor()
-            c.execute("SELECT start_time FROM submissions WHERE username=? AND question=?", (username, qname))
+            c.execute(self.QUERIES['start_time'], (username, qname))
             row = c.fetchone()
             if not row:
-                c.execute("INSERT INTO submissions (username, question, submitted, start_time) VALUES (?, ?, 0, ?)", (username, qname, time.time()))
+                c.execute(self.QUERIES['insert_start'], (username, qname, time.time()))
                 conn.commit()
 
     def get_time_left(self, username, qname):
         import sqlite3, time
         with self.lock, sqlite3.connect(self.db_path) as conn:
             c = conn.cursor()
-            c.execute("SELECT start_time FROM submissions WHERE username=? AND question=?", (username, qname))
+            c.execute(self.QUERIES['start_time'], (username, qname))
             row = c.fetchone()
             if row and row[0]:
                 elapsed = time.time() - row[0]
@@ -91,7 +111,7 @@ class QuestionManager:
         import sqlite3
         with sqlite3.connect(self.db_path) as conn:
             c = conn.cursor()
-            c.execute("SELECT submitted FROM submissions WHERE username=? AND question=?", (username, qname))
+            c.execute(self.QUERIES['submitted'], (username, qname))
             row = c.fetchone()
             submitted = row and row[0]
         return left > 0 and not submitted
@@ -110,14 +130,7 @@ class QuestionManager:
                 with sqlite3.connect(self.db_path) as conn:
                     c = conn.cursor()
                     # Insert or update submission status
-                    c.execute("""
-                        INSERT OR REPLACE INTO submissions 
-                        (username, question, submitted, start_time)
-                        VALUES (?, ?, 1, COALESCE(
-                            (SELECT start_time FROM submissions WHERE username=? AND question=?),
-                            ?
-                        ))
-                    """, (username, qname, username, qname, time.time()))
+                    c.execute(self.QUERIES['submit'], (username, qname, username, qname, time.time()))
                     conn.commit()
             except Exception as e:
                 logging.error(f"Error in submit_answer: {str(e)}")
@@ -127,17 +140,65 @@ class QuestionManager:
         import sqlite3
         with sqlite3.connect(self.db_path) as conn:
             c = conn.cursor()
-            c.execute("SELECT submitted FROM submissions WHERE username=? AND question=?", (username, qname))
+            c.execute(self.QUERIES['submitted'], (username, qname))
             row = c.fetchone()
             return row and row[0]
 
-    def get_all_submissions(self):
+    def has_started(self, username):
+        import sqlite3
+        with sqlite3.connect(self.db_path) as conn:
+            c = conn.cursor()
+            c.execute(self.QUERIES['has_started'], (username,))
+            return c.fetchone()[0] > 0
+
+    def get_user_progress(self, username):
+        """Return {qname: (submitted, start_time)} for the questions a user has opened."""
+        import sqlite3
+        with sqlite3.connect(self.db_path) as conn:
+            c = conn.cursor()
+            c.execute(self.QUERIES['user_progress'], (username,))
+            return {question: (submitted, start_time) for question, submitted, start_time in c.fetchall()}
+
+    def count_started_users(self):
+        import sqlite3
+        with sqlite3.connect(self.db_path) as conn:
+            c = conn.cursor()
+            c.execute(self.QUERIES['started_users'])
+            return c.fetchone()[0]
+
+    def get_submitted_pairs(self):
+        """Return the set of (username, qname) the database marks as submitted."""
+        import sqlite3
+        with sqlite3.connect(self.db_path) as conn:
+            c = conn.cursor()
+            c.execute(self.QUERIES['rollup'])
+            return {(username, question) for username, question, submitted in c.fetchall() if submitted}
+
+    def mark_submitted(self, entries, generation=None):
+        """Mark (username, qname, fallback_start_time) entries as submitted in one transaction.
+
+        With generation, nothing is written (and False is returned) if a session swap has
+        happened since the caller read it.
+        """
+        import sqlite3
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return False
+            with sqlite3.connect(self.db_path) as conn:
+                c = conn.cursor()
+                c.executemany(self.QUERIES['submit'], [(u, q, u, q, ts) for u, q, ts in entries])
+                conn.commit()
+        return True
+
+    def get_all_submissions(self, present=None):
+        # present: set of (username, qname) with a file on disk, e.g. from SubmissionIndex.
+        # When given it replaces the per-file filesystem check below.
         import sqlite3
         result = {}
         
         with sqlite3.connect(self.db_path) as conn:
             c = conn.cursor()
-            c.execute("SELECT username, question, submitted FROM submissions")
+            c.execute(self.QUERIES['rollup'])
             rows = c.fetchall()
             
             # Initialize result with all students from logins (so admins see every student)
@@ -158,6 +219,11 @@ class QuestionManager:
                 result[username][question] = bool(submitted)
                 
             # Check file system for submissions as backup
+            if present is not None:
+                for username, qname in present:
+                    if username in result and qname in result[username]:
+                        result[username][qname] = True
+                return result
             for username in result.keys():
                 user_dir = os.path.join(self.submissions_dir, username)
                 if os.path.exists(user_dir):
@@ -171,7 +237,7 @@ class QuestionManager:
         import sqlite3
         with sqlite3.connect(self.db_path) as conn:
             c = conn.cursor()
-            c.execute("DELETE FROM submissions")
+            c.execute(self.QUERIES['reset'])
             conn.commit()
 
     # --- Leave count metrics ---
@@ -181,27 +247,53 @@ class QuestionManager:
         with self.lock, sqlite3.connect(self.db_path) as conn:
             c = conn.cursor()
             # Ensure a row exists
-            c.execute("INSERT OR IGNORE INTO student_metrics (username, leave_count, last_leave_ts) VALUES (?, 0, 0)", (username,))
+            c.execute(self.QUERIES['ensure_metrics'], (username,))
             # Read last leave timestamp
-            c.execute("SELECT last_leave_ts FROM student_metrics WHERE username = ?", (username,))
+            c.execute(self.QUERIES['last_leave_ts'], (username,))
             row = c.fetchone()
             last_ts = float(row[0]) if row and row[0] is not None else 0.0
             now = time.time()
             # Debounce rapid events: only count if at least 3 seconds since last recorded leave
             if now - last_ts >= 3.0:
-                c.execute("UPDATE student_metrics SET leave_count = leave_count + 1, last_leave_ts = ? WHERE username = ?", (now, username))
+                c.execute(self.QUERIES['count_leave'], (now, username))
                 conn.commit()
             else:
                 # Update last_leave_ts to the latest time to avoid repeated near-simultaneous events
-                c.execute("UPDATE student_metrics SET last_leave_ts = ? WHERE username = ?", (now, username))
+                c.execute(self.QUERIES['touch_leave'], (now, username))
                 conn.commit()
 
+    def record_events(self, username, events):
+        """Store a telemetry batch of (event, qname, ts) and apply leave counting in one transaction.
+
+        Leave events follow the same 3-second debounce as increment_leave_count, evaluated in
+        event-time order: each one counts only if at least 3 seconds passed since the previous one.
+        """
+        import sqlite3
+        events = sorted(events, key=lambda e: e[2])
+        with self.lock, sqlite3.connect(self.db_path) as conn:
+            c = conn.cursor()
+            c.execute(self.QUERIES['ensure_metrics'], (username,))
+            c.execute(self.QUERIES['last_leave_ts'], (username,))
+            row = c.fetchone()
+            last_ts = float(row[0]) if row and row[0] is not None else 0.0
+            added = 0
+            for event, _, ts in events:
+                if event not in self.LEAVE_EVENTS:
+                    continue
+                if ts - last_ts >= 3.0:
+                    added += 1
+                last_ts = max(last_ts, ts)
+            c.execute(self.QUERIES['add_leaves'], (added, last_ts, username))
+            c.executemany(self.QUERIES['insert_event'], [(username, event, qname, ts) for event, qname, ts in events])
+            conn.commit()
+        return added
+
     def get_leave_counts(self):
         import sqlite3
         result = {}
         with sqlite3.connect(self.db_path) as conn:
             c = conn.cursor()
-            c.execute("SELECT username, leave_count FROM student_metrics")
+            c.execute(self.QUERIES['leave_counts'])
             rows = c.fetchall()
             for username, leave_count in rows:
                 result[username] = leave_count
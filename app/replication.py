@@ -0,0 +1,238 @@
+"""
+Warm Standby Replication for School Hackathon
+Ships the SQLite database (backup API) and new submission files to a standby data directory,
+with a manifest the standby reads to report its lag and to fence the old primary on promotion.
+Compatible with Python 3.10+
+"""
+import json
+import logging
+import os
+import queue
+import shutil
+import sqlite3
+import threading
+import time
+
+MANIFEST = 'replication.json'      # written by the primary after every cycle
+PROMOTED = 'promoted.json'         # written by the standby; the primary never touches it
+
+
+def read_manifest(data_dir):
+    try:
+        with open(os.path.join(data_dir, MANIFEST), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def read_promotion(data_dir):
+    try:
+        with open(os.path.join(data_dir, PROMOTED), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def write_manifest(data_dir, manifest, name=MANIFEST):
+    path = os.path.join(data_dir, name)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f)
+    os.replace(path + '.tmp', path)
+
+
+def _copy_file(src, dest):
+    # Copy beside the target and rename, so the standby never reads half a file
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    shutil.copy2(src, dest + '.tmp')
+    os.replace(dest + '.tmp', dest)
+
+
+class Replicator:
+    """Runs on the primary; keeps replica_dir a consistent, slightly delayed copy of the live data."""
+
+    def __init__(self, qm, replica_dir, interval=2.0):
+        self.qm = qm
+        self.replica_dir = replica_dir
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.files = queue.Queue()      # (username, qname) committed since the last cycle
+        self.full_sync = threading.Event()
+        self.full_sync.set()            # first cycle copies everything
+        self.shipped_stamp = None       # (inode, change counter) of the last DB image shipped
+        self.state = {'synced_at': None, 'shipped_at': None, 'files': 0, 'error': None, 'fenced': False}
+        os.makedirs(os.path.join(self.replica_dir, 'submissions'), exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name='replicator', daemon=True)
+
+    def start(self):
+        if not self._thread.is_alive():
+            self._thread.start()
+        return self
+
+    def enqueue(self, username, qname):
+        self.files.put((username, qname))
+
+    def resync(self):
+        """Request a full file comparison and DB copy (after a session swap)."""
+        self.full_sync.set()
+
+    def status(self):
+        with self.lock:
+            state = dict(self.state)
+        state['lag'] = time.time() - state['synced_at'] if state['synced_at'] else None
+        return state
+
+    def _db_stamp(self):
+        # The header's file change counter moves on every commit (rollback-journal mode) and a
+        # swapped-in file has a new inode. No handle stays open between cycles, so session swaps
+        # can still replace the file on Windows.
+        with open(self.qm.db_path, 'rb') as f:
+            header = f.read(28)
+        return os.stat(self.qm.db_path).st_ino, header[24:28]
+
+    def _replica_missing_files(self):
+        """(username, qname) rows the shipped DB marks submitted whose file the replica lacks."""
+        dest_root = os.path.join(self.replica_dir, 'submissions')
+        conn = sqlite3.connect(os.path.join(self.replica_dir, 'submissions.db'))
+        try:
+            rows = conn.execute(self.qm.QUERIES['rollup']).fetchall()
+        finally:
+            conn.close()
+        return {(u, q) for u, q, submitted in rows
+                if submitted and not os.path.exists(os.path.join(dest_root, u, f"{q}.py"))}
+
+    def _ship_files(self, full, db_shipped):
+        src_root = self.qm.submissions_dir
+        dest_root = os.path.join(self.replica_dir, 'submissions')
+        pending = set()
+        while True:
+            try:
+                pending.add(self.files.get_nowait())
+            except queue.Empty:
+                break
+        if db_shipped and not full:
+            # The answer file lands before its row commits, so any row in the image just
+            # shipped already has its file on the primary
+            pending |= self._replica_missing_files()
+        copied = 0
+        if full:
+            wanted = set()
+            for dirpath, _, filenames in os.walk(src_root):
+                for name in filenames:
+                    src = os.path.join(dirpath, name)
+                    rel = os.path.relpath(src, src_root)
+                    wanted.add(rel)
+                    dest = os.path.join(dest_root, rel)
+                    st = os.stat(src)
+                    try:
+                        dst = os.stat(dest)
+                        if dst.st_size == st.st_size and dst.st_mtime == st.st_mtime:
+                            continue
+                    except FileNotFoundError:
+                        pass
+                    _copy_file(src, dest)
+                    copied += 1
+            # Drop files that no longer exist on the primary (new or restored session)
+            for dirpath, _, filenames in os.walk(dest_root, topdown=False):
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    if os.path.relpath(path, dest_root) not in wanted:
+                        os.remove(path)
+                if dirpath != dest_root and not os.listdir(dirpath):
+                    os.rmdir(dirpath)
+        else:
+            for username, qname in sorted(pending):
+                rel = os.path.join(username, f"{qname}.py")
+                if os.path.exists(os.path.join(src_root, rel)):
+                    _copy_file(os.path.join(src_root, rel), os.path.join(dest_root, rel))
+                    copied += 1
+        return copied
+
+    def _ship_db(self):
+        src = sqlite3.connect(self.qm.db_path)
+        dest = sqlite3.connect(os.path.join(self.replica_dir, 'submissions.db'))
+        try:
+            # Copies in steps so standby readers are only blocked between pages, not for the whole copy
+            src.backup(dest, pages=256, sleep=0.005)
+        finally:
+            dest.close()
+            src.close()
+
+    def ship(self):
+        """One replication cycle: the DB image first, then the files for every submitted row in it."""
+        started = time.time()
+        if self._fenced():
+            return False
+        full = self.full_sync.is_set()
+        self.full_sync.clear()
+        try:
+            stamp = self._db_stamp()
+            changed = stamp != self.shipped_stamp
+            if self._fenced():
+                return False
+            if changed or full:
+                self._ship_db()
+                self.shipped_stamp = stamp
+            copied = self._ship_files(full, changed or full)
+        except Exception:
+            if full:
+                self.full_sync.set()
+            raise
+        write_manifest(self.replica_dir, {
+            'synced_at': started,
+            'primary_pid': os.getpid(),
+            'primary_db': self.qm.db_path,
+        })
+        with self.lock:
+            self.state['synced_at'] = started
+            self.state['error'] = None
+            if copied or changed or full:
+                self.state['shipped_at'] = started
+            self.state['files'] += copied
+        return True
+
+    def _fenced(self):
+        # The standby took over; writing into it now would clobber its new data
+        if read_promotion(self.replica_dir) is None:
+            return False
+        with self.lock:
+            self.state.update(fenced=True, error='standby was promoted; replication stopped')
+        return True
+
+    def _run(self):
+        while True:
+            try:
+                if not self.ship():
+                    logging.error("Replication stopped: the standby has been promoted")
+                    return
+            except Exception as e:
+                with self.lock:
+                    self.state['error'] = str(e)
+                logging.error(f"Replication cycle failed: {e}")
+            time.sleep(self.interval)
+
+
+class Standby:
+    """Runs on the second instance; read-only until promoted."""
+
+    def __init__(self, data_dir, active=False):
+        self.data_dir = data_dir
+        self.active = active
+        self.lock = threading.Lock()
+
+    def status(self):
+        synced_at = read_manifest(self.data_dir).get('synced_at')
+        promotion = read_promotion(self.data_dir) or {}
+        return {
+            'synced_at': synced_at,
+            'lag': time.time() - synced_at if synced_at else None,
+            'promoted_at': promotion.get('promoted_at'),
+        }
+
+    def promote(self):
+        """Fence the primary through the manifest and start accepting writes."""
+        with self.lock:
+            if not self.active:
+                return False
+            write_manifest(self.data_dir, {'promoted_at': time.time(), 'pid': os.getpid()}, name=PROMOTED)
+            self.active = False
+            return True
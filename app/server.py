@@ -10,16 +10,22 @@ Compatible with Python 3.10+
 USE_EVENTLET = False
 
 import os
-import ssl
 import json
-import sqlite3  # Add this import
 import traceback
-from flask import Flask, render_template, request, redirect, url_for, session, send_from_directory
+from flask import Flask, render_template, request, redirect, url_for, session, send_from_directory, g
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from werkzeug.utils import secure_filename
 from werkzeug.exceptions import HTTPException
-import psutil
 from question_manager import QuestionManager
+from error_feed import ErrorFeed, ErrorFeedHandler
+from stats_collector import StatsCollector
+from admission import AdmissionController
+from session_store import SessionStore
+from similarity import SimilarityEngine
+from submission_index import SubmissionIndex
+from replication import Replicator, Standby
+from profiler import SamplingProfiler, top_functions, render_flamegraph
+from tls_config import ensure_certificate, build_ssl_context, waitress_options, werkzeug_options
 from flask_socketio import SocketIO, emit
 import logging
 from dotenv import load_dotenv
@@ -29,11 +35,21 @@ load_dotenv()
 
 # --- Config ---
 QUESTIONS_DIR = os.path.join(os.path.dirname(__file__), 'questions')
-SUBMISSIONS_DIR = os.path.join(os.path.dirname(__file__), 'submissions')
+# DATA_DIR holds everything one instance writes: submissions.db, submissions/, uploads/,
+# sessions/ and logs/. A standby points it at the replica so two instances never share state.
+DATA_DIR = os.getenv('DATA_DIR', os.path.dirname(__file__))
+SUBMISSIONS_DIR = os.path.join(DATA_DIR, 'submissions')
+LOGS_DIR = os.path.join(DATA_DIR, 'logs')
 LOGINS_PATH = os.path.join(os.path.dirname(__file__), 'logins.json')
 SSL_CERT = os.path.join(os.path.dirname(__file__), 'cert.pem')
 SSL_KEY = os.path.join(os.path.dirname(__file__), 'key.pem')
-UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads')
+# Uploads sit beside submissions/ so submit_answer's os.replace never crosses filesystems
+UPLOAD_FOLDER = os.path.join(DATA_DIR, 'uploads')
+PROFILES_DIR = os.path.join(LOGS_DIR, 'profiles')
+SESSIONS_DIR = os.path.join(DATA_DIR, 'sessions')
+ERRORS_DB_PATH = os.path.join(LOGS_DIR, 'errors.db')
+ERRORS_LOG_PATH = os.path.join(LOGS_DIR, 'errors.log')
+PORT = int(os.getenv('PORT', '5000'))
 ALLOWED_EXTENSIONS = {'py'}
 
 app = Flask(__name__)
@@ -92,14 +108,117 @@ def log_response_info(response):
         app.logger.exception('Failed to log response info')
     return response
 
-DB_PATH = os.path.join(os.path.dirname(__file__), 'submissions.db')
-qm = QuestionManager(QUESTIONS_DIR, SUBMISSIONS_DIR, LOGINS_PATH, DB_PATH)
-errors = []
+# --- Admission control (shapes the exam-start stampede) ---
+ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', '1') == '1'
+admission = AdmissionController(
+    ip_rate=float(os.getenv('ADMISSION_IP_RATE', '5')),
+    ip_burst=int(os.getenv('ADMISSION_IP_BURST', '20')),
+    user_rate=float(os.getenv('ADMISSION_USER_RATE', '3')),
+    user_burst=int(os.getenv('ADMISSION_USER_BURST', '10')),
+    max_concurrent=int(os.getenv('ADMISSION_MAX_CONCURRENT', '8')),
+    queue_timeout=float(os.getenv('ADMISSION_QUEUE_TIMEOUT', '2'))
+)
+# Cheap or fire-and-forget endpoints that are never throttled
+ADMISSION_EXEMPT_ENDPOINTS = {'student_leave', 'student_telemetry', 'static', 'img_file', 'favicon'}
+# Routes that hit the database on every request share the concurrency cap
+DB_HEAVY_ENDPOINTS = {'dashboard', 'review', 'question'}
+
+
+def waiting_room(status, retry_after):
+    response = app.make_response((render_template('waiting_room.html', retry_after=retry_after), status))
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+@app.before_request
+def admit_request():
+    if not ADMISSION_ENABLED or request.endpoint in ADMISSION_EXEMPT_ENDPOINTS:
+        return None
+    if request.path.startswith('/admin') or (current_user.is_authenticated and current_user.is_admin):
+        return None
+    # Answer uploads are never turned away; they wait for a slot instead
+    is_submission = request.endpoint == 'question' and request.method == 'POST'
+    if not is_submission:
+        user = current_user.id if current_user.is_authenticated else None
+        retry_after = admission.check_rate(request.remote_addr or 'unknown', user)
+        if retry_after:
+            return waiting_room(429, retry_after)
+    if request.endpoint in DB_HEAVY_ENDPOINTS:
+        if is_submission:
+            admission.slots.acquire()
+        elif not admission.acquire_slot():
+            return waiting_room(503, 2)
+        g.admission_slot = True
+    return None
+
 
-# Ensure the logs directory exists
-os.makedirs(os.path.join(os.path.dirname(__file__), 'logs'), exist_ok=True)
-# Initialize logging
-logging.basicConfig(filename='app/logs/errors.log', level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
+# Requests a standby still serves: logging in, static files, admin pages (read) and promotion
+STANDBY_ALLOWED_ENDPOINTS = {'login', 'logout', 'admin_logout', 'static', 'img_file', 'favicon', 'admin_promote'}
+
+
+@app.before_request
+def standby_read_only():
+    if not standby.active or request.endpoint in STANDBY_ALLOWED_ENDPOINTS:
+        return None
+    if request.method == 'GET' and current_user.is_authenticated and current_user.is_admin:
+        return None
+    return app.make_response((render_template('standby.html'), 503))
+
+
+@app.teardown_request
+def release_admission_slot(exc):
+    if g.pop('admission_slot', False):
+        admission.release_slot()
+
+# Ensure the data and logs directories exist
+os.makedirs(LOGS_DIR, exist_ok=True)
+DB_PATH = os.path.join(DATA_DIR, 'submissions.db')
+qm = QuestionManager(QUESTIONS_DIR, SUBMISSIONS_DIR, LOGINS_PATH, DB_PATH)
+# STANDBY=1 serves a replica read-only until an admin promotes it
+standby = Standby(DATA_DIR, active=os.getenv('STANDBY') == '1')
+sessions = SessionStore(qm, SESSIONS_DIR)
+# Copy detection; indexes existing submissions in the background, then each new one as it arrives
+similarity = SimilarityEngine(SUBMISSIONS_DIR, qm.timers.keys()).start()
+# Which answers exist on disk, so request handlers never stat the submissions tree
+submission_index = SubmissionIndex(qm, rescan_interval=float(os.getenv('RECONCILE_INTERVAL', '120')))
+if not standby.active:
+    # Reconciliation repairs the database, which a standby must leave to the primary
+    submission_index.start()
+# REPLICA_DIR ships the database and new answers to a standby's DATA_DIR
+replicator = None
+if os.getenv('REPLICA_DIR') and not standby.active:
+    replicator = Replicator(qm, os.getenv('REPLICA_DIR'),
+                            interval=float(os.getenv('REPLICATION_INTERVAL', '2'))).start()
+
+# Grouped errors; updates reach the /admin namespace from a background thread
+error_feed = ErrorFeed(
+    ERRORS_DB_PATH,
+    emit=lambda groups: socketio.emit('error_update', {'errors': groups}, namespace='/admin')
+)
+# Errors logged anywhere (question manager, reconciler, replicator, ...) reach the feed too
+logging.getLogger().addHandler(ErrorFeedHandler(error_feed))
+# Connected /admin Socket.IO sessions (sid set), reported by the stats collector
+admin_sids = set()
+# One sampler for all admin clients; each sample is broadcast once to the /admin Socket.IO room
+stats = StatsCollector(
+    lambda: qm.db_path,
+    session_count=lambda: len(admin_sids),
+    emit=lambda sample: socketio.emit('stats_update', dict(sample, replication=replication_status()),
+                                      namespace='/admin'),
+    interval=float(os.getenv('STATS_INTERVAL', '5'))
+).start()
+# On-demand sampling profiler for admins; idle unless a capture is running
+profiler = SamplingProfiler(PROFILES_DIR)
+# Initialize logging. question_manager's basicConfig opened app/logs/errors.log relative to the
+# working directory; move that file handler to this instance's LOGS_DIR.
+for handler in list(root_logger.handlers):
+    if isinstance(handler, logging.FileHandler) and handler.baseFilename != os.path.abspath(ERRORS_LOG_PATH):
+        root_logger.removeHandler(handler)
+        handler.close()
+if not any(isinstance(h, logging.FileHandler) for h in root_logger.handlers):
+    file_handler = logging.FileHandler(ERRORS_LOG_PATH)
+    file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    root_logger.addHandler(file_handler)
 
 # --- User Model ---
 class User(UserMixin):
@@ -121,11 +240,33 @@ def load_user(user_id):
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def format_stats(sample):
+    return (f"CPU: {sample['cpu']}% | RAM: {sample['ram']}% | RSS: {sample['rss'] // (1024 * 1024)} MB"
+            f" | FDs: {sample['fds']} | Threads: {sample['threads']} | Sockets: {sample['sockets']}"
+            f" | DB: {sample['db_size'] // 1024} KB")
+
+def after_submission(username, qname):
+    # Keep the derived indexes in step with a newly stored answer
+    submission_index.record(username, qname)
+    similarity.enqueue(username, qname)
+    if replicator:
+        replicator.enqueue(username, qname)
+
+def after_session_swap():
+    submission_index.build()
+    similarity.rescan()
+    if replicator:
+        replicator.resync()
+
+def replication_status():
+    if standby.active:
+        return dict(standby.status(), role='standby')
+    if replicator:
+        return dict(replicator.status(), role='primary', target=replicator.replica_dir)
+    return None
+
 def log_error(msg):
-    errors.append(msg)
-    if len(errors) > 10:
-        errors.pop(0)
-    socketio.emit('error_update', {'errors': errors}, namespace='/admin')
+    # ErrorFeedHandler forwards this to the admin error feed
     logging.error(msg)
 
 # --- Routes ---
@@ -153,12 +294,7 @@ def dashboard():
         return redirect(url_for('admin_dashboard'))
         
     # Check if user has started any questions
-    with sqlite3.connect(DB_PATH) as conn:
-        c = conn.cursor()
-        c.execute("SELECT COUNT(*) FROM submissions WHERE username=?", (current_user.id,))
-        has_started = c.fetchone()[0] > 0
-    
-    if not has_started:
+    if not qm.has_started(current_user.id):
         return render_template('start_test.html', username=current_user.id)
     
     questions = list(qm.timers.keys())
@@ -171,8 +307,8 @@ def dashboard():
         try:
             submitted[q] = bool(qm.has_submitted(current_user.id, q))
         except Exception:
-            # Fallback: check for file on disk
-            submitted[q] = os.path.exists(os.path.join(SUBMISSIONS_DIR, current_user.id, f"{q}.py"))
+            # Fallback: check the index of files on disk
+            submitted[q] = submission_index.has(current_user.id, q)
 
     # Determine the current active/available question: the first question not submitted
     for q in questions:
@@ -204,23 +340,17 @@ def review():
     submissions = {}
     from datetime import datetime
     
-    with sqlite3.connect(DB_PATH) as conn:
-        c = conn.cursor()
-        questions = list(qm.timers.keys())
-        for qname in questions:
-            c.execute("""
-                SELECT submitted, start_time 
-                FROM submissions 
-                WHERE username=? AND question=?
-            """, (current_user.id, qname))
-            row = c.fetchone()
-            file_exists = os.path.exists(os.path.join(SUBMISSIONS_DIR, current_user.id, f"{qname}.py"))
-            
-            submissions[qname] = {
-                'name': qname,
-                'submitted': bool(row and row[0]) or file_exists,
-                'time': datetime.fromtimestamp(row[1]).strftime('%Y-%m-%d %H:%M:%S') if row and row[1] else None
-            }
+    progress = qm.get_user_progress(current_user.id)
+    questions = list(qm.timers.keys())
+    for qname in questions:
+        row = progress.get(qname)
+        file_exists = submission_index.has(current_user.id, qname)
+        
+        submissions[qname] = {
+            'name': qname,
+            'submitted': bool(row and row[0]) or file_exists,
+            'time': datetime.fromtimestamp(row[1]).strftime('%Y-%m-%d %H:%M:%S') if row and row[1] else None
+        }
     
     return render_template('review.html', submissions=submissions)
 
@@ -250,6 +380,7 @@ def question():
                 # Create a small temp file path to pass into qm.submit_answer
                 temp_path = dest
                 qm.submit_answer(current_user.id, qname, temp_path)
+                after_submission(current_user.id, qname)
 
                 # Redirect to next question or review
                 questions = list(qm.timers.keys())
@@ -284,6 +415,7 @@ def question():
                 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
                 file.save(temp_path)
                 qm.submit_answer(current_user.id, qname, temp_path)
+                after_submission(current_user.id, qname)
                 
                 # Find next question
                 questions = list(qm.timers.keys())
@@ -347,24 +479,25 @@ def admin_dashboard():
     if not current_user.is_admin:
         return redirect(url_for('dashboard'))
     
-    submissions = qm.get_all_submissions()
+    submissions = qm.get_all_submissions(present=submission_index.present())
     leave_counts = qm.get_leave_counts()
     # Count users with any timer started
-    import sqlite3
-    with sqlite3.connect(DB_PATH) as conn:
-        c = conn.cursor()
-        c.execute("SELECT COUNT(DISTINCT username) FROM submissions WHERE start_time IS NOT NULL")
-        user_count = c.fetchone()[0]
-    system_status = f"CPU: {psutil.cpu_percent()}% | RAM: {psutil.virtual_memory().percent}%"
+    user_count = qm.count_started_users()
+    system_status = format_stats(stats.latest())
     success_message = session.pop('success_message', None)
+    error_message = session.pop('error_message', None)
     return render_template('admin.html', 
                          user_count=user_count, 
                          submissions=submissions, 
                          questions=list(qm.timers.keys()), 
                          system_status=system_status, 
-                         errors=errors,
+                         errors=error_feed.get_recent(),
                          success_message=success_message,
-                         leave_counts=leave_counts)
+                         error_message=error_message,
+                         leave_counts=leave_counts,
+                         snapshots=sessions.list_snapshots(),
+                         mismatches=submission_index.get_mismatches(),
+                         replication=replication_status())
 
 
 @app.route('/admin/stats')
@@ -373,9 +506,11 @@ def admin_stats():
     if not current_user.is_admin:
         return ("", 403)
     try:
+        # Served from the shared sampler; polling adds no measurement cost
         return {
-            'cpu': psutil.cpu_percent(),
-            'ram': psutil.virtual_memory().percent
+            'latest': stats.latest(),
+            'history': stats.history(),
+            'replication': replication_status()
         }
     except Exception as e:
         log_error(f"admin_stats error: {e}")
@@ -396,6 +531,71 @@ def student_leave():
         log_error(f"student_leave error: {e}")
         return ('', 500)
 
+# Batched focus/visibility telemetry (replaces one /student/leave request per event)
+TELEMETRY_MAX_BYTES = 64 * 1024
+TELEMETRY_MAX_EVENTS = 500
+TELEMETRY_EVENTS = {'blur', 'focus', 'hidden', 'visible', 'unload'}
+
+
+def parse_telemetry(body):
+    """Validate a telemetry batch and return [(event, qname, server_ts)], or None if invalid."""
+    import gzip
+    import io
+    import time
+    # sendBeacon cannot set Content-Encoding, so detect gzip by its magic bytes
+    if body[:2] == b'\x1f\x8b':
+        try:
+            with gzip.GzipFile(fileobj=io.BytesIO(body)) as gz:
+                body = gz.read(TELEMETRY_MAX_BYTES + 1)
+        except OSError:
+            return None
+        if len(body) > TELEMETRY_MAX_BYTES:
+            return None
+    try:
+        batch = json.loads(body)
+        sent_at = float(batch['sent_at'])
+        raw_events = batch['events']
+    except (ValueError, KeyError, TypeError):
+        return None
+    if not isinstance(raw_events, list) or len(raw_events) > TELEMETRY_MAX_EVENTS:
+        return None
+    now = time.time()
+    events = []
+    for e in raw_events:
+        if not isinstance(e, dict) or e.get('type') not in TELEMETRY_EVENTS:
+            return None
+        qname = e.get('qname')
+        if qname is not None and not isinstance(qname, str):
+            return None
+        if qname not in qm.timers:
+            qname = None
+        try:
+            # Client timestamps are milliseconds; map them onto the server clock via sent_at
+            ts = now - (sent_at - float(e['ts'])) / 1000.0
+        except (KeyError, TypeError, ValueError):
+            return None
+        events.append((e['type'], qname, min(now, max(now - 3600, ts))))
+    return events
+
+
+@app.route('/student/telemetry', methods=['POST'])
+@login_required
+def student_telemetry():
+    if current_user.is_admin:
+        return ("", 403)
+    if (request.content_length or 0) > TELEMETRY_MAX_BYTES:
+        return ('', 413)
+    events = parse_telemetry(request.get_data(cache=False))
+    if events is None:
+        return ('', 400)
+    try:
+        if events:
+            qm.record_events(current_user.id, events)
+        return ('', 204)
+    except Exception as e:
+        log_error(f"student_telemetry error: {e}")
+        return ('', 500)
+
 @app.route('/admin/logout', methods=['POST'])
 @login_required
 def admin_logout():
@@ -421,42 +621,131 @@ def reset_database():
         return redirect(url_for('dashboard'))
     
     try:
-        # Delete all submission files
-        import shutil
-        if os.path.exists(SUBMISSIONS_DIR):
-            shutil.rmtree(SUBMISSIONS_DIR)
-            os.makedirs(SUBMISSIONS_DIR)
-            
-        # Reset database
-        with sqlite3.connect(DB_PATH) as conn:
-            c = conn.cursor()
-            c.execute("DELETE FROM submissions")
-            conn.commit()
+        # Optionally archive the finishing session (e.g. the previous house) first
+        snapshot_name = secure_filename(request.form.get('snapshot_name', '').strip())
+        if snapshot_name:
+            if any(s['name'] == snapshot_name for s in sessions.list_snapshots()):
+                session['error_message'] = (f"Database was NOT reset: a snapshot named '{snapshot_name}'"
+                                            f" already exists. Choose another name.")
+                return redirect(url_for('admin_dashboard'))
+            sessions.snapshot(snapshot_name)
+
+        # Swap in an empty database and submissions directory
+        sessions.new_session()
+        after_session_swap()
             
-        # Clear error logs
-        global errors
-        errors = []
+        # Clear the recent error list (grouped errors stay queryable under /admin/logs)
+        error_feed.clear()
         
-        session['success_message'] = "Database successfully reset. All submissions have been cleared."
+        message = "Database successfully reset. All submissions have been cleared."
+        if snapshot_name:
+            message += f" Previous session saved as '{snapshot_name}'."
+        session['success_message'] = message
         return redirect(url_for('admin_dashboard'))
         
     except Exception as e:
         log_error(f"Database reset failed: {str(e)}\n{traceback.format_exc()}")
+        session['error_message'] = f"Database was NOT reset: {e}"
         return redirect(url_for('admin_dashboard'))
 
+@app.route('/admin/sessions/snapshot', methods=['POST'])
+@login_required
+def snapshot_session():
+    if not current_user.is_admin:
+        return redirect(url_for('dashboard'))
+    name = secure_filename(request.form.get('snapshot_name', '').strip())
+    if not name:
+        from datetime import datetime
+        name = datetime.now().strftime('session-%Y%m%d-%H%M%S')
+    try:
+        sessions.snapshot(name)
+        session['success_message'] = f"Session saved as '{name}'."
+    except Exception as e:
+        log_error(f"Snapshot failed: {str(e)}\n{traceback.format_exc()}")
+        session['error_message'] = f"Snapshot failed: {e}"
+    return redirect(url_for('admin_dashboard'))
+
+@app.route('/admin/sessions/restore', methods=['POST'])
+@login_required
+def restore_session():
+    if not current_user.is_admin:
+        return redirect(url_for('dashboard'))
+    name = secure_filename(request.form.get('snapshot_name', ''))
+    try:
+        sessions.restore(name)
+        after_session_swap()
+        session['success_message'] = f"Session '{name}' restored."
+    except Exception as e:
+        log_error(f"Restore failed: {str(e)}\n{traceback.format_exc()}")
+        session['error_message'] = f"Restore failed: {e}"
+    return redirect(url_for('admin_dashboard'))
+
+@app.route('/admin/replication/promote', methods=['POST'])
+@login_required
+def admin_promote():
+    if not current_user.is_admin:
+        return redirect(url_for('dashboard'))
+    if standby.promote():
+        # Start the writers a primary runs and index the replicated answers
+        submission_index.start()
+        after_session_swap()
+        session['success_message'] = "This instance is now the primary; the old primary will stop replicating to it."
+    return redirect(url_for('admin_dashboard'))
+
+@app.route('/admin/similarity', methods=['GET'])
+@login_required
+def admin_similarity():
+    if not current_user.is_admin:
+        return redirect(url_for('dashboard'))
+    return render_template('similarity.html', report=similarity.report())
+
+@app.route('/admin/similarity/rescan', methods=['POST'])
+@login_required
+def admin_similarity_rescan():
+    if not current_user.is_admin:
+        return redirect(url_for('dashboard'))
+    similarity.rescan()
+    return redirect(url_for('admin_similarity'))
+
+@app.route('/admin/profiler', methods=['GET'])
+@login_required
+def admin_profiler():
+    if not current_user.is_admin:
+        return redirect(url_for('dashboard'))
+    name = secure_filename(request.args.get('capture', ''))
+    stacks = profiler.load(name) if name else None
+    return render_template('admin_profiler.html',
+                         status=profiler.get_status(),
+                         captures=profiler.list_captures(),
+                         capture=name if stacks is not None else None,
+                         flamegraph=render_flamegraph(stacks) if stacks else '',
+                         top=top_functions(stacks) if stacks else [])
+
+@app.route('/admin/profiler/start', methods=['POST'])
+@login_required
+def admin_profiler_start():
+    if not current_user.is_admin:
+        return redirect(url_for('dashboard'))
+    try:
+        duration = float(request.form.get('duration', 10))
+        rate = int(request.form.get('rate', 100))
+    except ValueError:
+        return redirect(url_for('admin_profiler'))
+    profiler.start(duration, rate)
+    return redirect(url_for('admin_profiler'))
+
 @app.route('/admin/logs', methods=['GET'])
 @login_required
 def view_logs():
     if not current_user.is_admin:
         return redirect(url_for('dashboard'))
 
-    log_file_path = os.path.join(os.path.dirname(__file__), 'logs', 'errors.log')
-    if os.path.exists(log_file_path):
-        with open(log_file_path, 'r') as log_file:
-            logs = log_file.readlines()
-        return render_template('admin_logs.html', logs=logs)
-    else:
-        return render_template('admin_logs.html', logs=None)
+    from datetime import datetime
+    groups = error_feed.query()
+    for group in groups:
+        group['first_seen'] = datetime.fromtimestamp(group['first_seen']).strftime('%Y-%m-%d %H:%M:%S')
+        group['last_seen'] = datetime.fromtimestamp(group['last_seen']).strftime('%Y-%m-%d %H:%M:%S')
+    return render_template('admin_logs.html', groups=groups)
 
 # --- Error Handling ---
 @app.errorhandler(Exception)
@@ -471,59 +760,27 @@ def handle_exception(e):
 
 # --- SSL Context ---
 def get_ssl_context():
-    if not os.path.exists(SSL_CERT) or not os.path.exists(SSL_KEY):
-        from cryptography import x509
-        from cryptography.x509.oid import NameOID
-        from cryptography.hazmat.primitives import hashes, serialization
-        from cryptography.hazmat.primitives.asymmetric import rsa
-        from cryptography.hazmat.backends import default_backend
-        import datetime
-        # Generate key
-        key = rsa.generate_private_key(public_exponent=65537, key_size=2048, backend=default_backend())
-        with open(SSL_KEY, "wb") as f:
-            f.write(key.private_bytes(
-                encoding=serialization.Encoding.PEM,
-                format=serialization.PrivateFormat.TraditionalOpenSSL,
-                encryption_algorithm=serialization.NoEncryption()
-            ))
-        # Generate cert
-        subject = issuer = x509.Name([
-            x509.NameAttribute(NameOID.COUNTRY_NAME, u"US"),
-            x509.NameAttribute(NameOID.STATE_OR_PROVINCE_NAME, u"CA"),
-            x509.NameAttribute(NameOID.LOCALITY_NAME, u"School"),
-            x509.NameAttribute(NameOID.ORGANIZATION_NAME, u"Hackathon"),
-            x509.NameAttribute(NameOID.COMMON_NAME, u"localhost"),
-        ])
-        cert = x509.CertificateBuilder().subject_name(subject).issuer_name(issuer).public_key(
-            key.public_key()
-        ).serial_number(x509.random_serial_number()).not_valid_before(
-            datetime.datetime.utcnow()
-        ).not_valid_after(
-            datetime.datetime.utcnow() + datetime.timedelta(days=365)
-        ).add_extension(
-            x509.SubjectAlternativeName([x509.DNSName(u"localhost")]), critical=False,
-        ).sign(key, hashes.SHA256(), default_backend())
-        with open(SSL_CERT, "wb") as f:
-            f.write(cert.public_bytes(serialization.Encoding.PEM))
-    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
-    context.load_cert_chain(SSL_CERT, SSL_KEY)
-    return context
+    # ECDSA P-256 certificate, modern ciphers and session tickets (see tls_config.py)
+    ensure_certificate(SSL_CERT, SSL_KEY)
+    return build_ssl_context(SSL_CERT, SSL_KEY)
 
 # --- SocketIO Events ---
 @socketio.on('connect', namespace='/admin')
 def admin_connect():
-    emit('error_update', {'errors': errors})
-    emit('stats_update', {
-        'cpu': psutil.cpu_percent(),
-        'ram': psutil.virtual_memory().percent
-    })
+    # Stats and errors are broadcast to the whole namespace; only admins may join it
+    if not current_user.is_authenticated or not current_user.is_admin:
+        return False
+    admin_sids.add(request.sid)
+    emit('error_update', {'errors': error_feed.get_recent()})
+    emit('stats_history', {'history': stats.history()})
+
+@socketio.on('disconnect', namespace='/admin')
+def admin_disconnect():
+    admin_sids.discard(request.sid)
 
 @socketio.on('request_stats', namespace='/admin')
 def send_stats():
-    emit('stats_update', {
-        'cpu': psutil.cpu_percent(),
-        'ram': psutil.virtual_memory().percent
-    })
+    emit('stats_update', dict(stats.latest(), replication=replication_status()))
 
 # --- Run Server ---
 def run_server():
@@ -542,13 +799,17 @@ def run_server():
         # transports — Socket.IO will fall back to polling unless eventlet/gevent
         # is used.
         use_waitress = os.getenv('USE_WAITRESS') == '1' or os.getenv('PRODUCTION') == '1'
+        # USE_TLS=1 serves HTTPS with the tuned context; Waitress cannot terminate TLS itself
+        use_tls = os.getenv('USE_TLS') == '1'
         if use_waitress:
+            if use_tls:
+                print('USE_TLS is ignored under Waitress; terminate TLS in front of it')
             try:
                 from waitress import serve
                 print('Starting server under Waitress WSGI server (production mode)')
                 # Wrap the Socket.IO app as a WSGI application
                 wsgi_app = socketio.WSGIApp(app)
-                serve(wsgi_app, host='0.0.0.0', port=5000)
+                serve(wsgi_app, host='0.0.0.0', port=PORT, **waitress_options())
                 return
             except Exception as e:
                 print(f'Waitress not available or failed to start: {e}. Falling back to socketio.run()')
@@ -556,26 +817,12 @@ def run_server():
         socketio.run(
             app,
             host='0.0.0.0',
-            port=5000,
+            port=PORT,
             debug=True,
-            use_reloader=False
+            use_reloader=False,
+            ssl_context=get_ssl_context() if use_tls else None,
+            **werkzeug_options()
         )
 
 if __name__ == '__main__':
     run_server()
-
-# Add indexes to the database
-def _init_db(self):
-    import sqlite3
-    with sqlite3.connect(self.db_path) as conn:
-        c = conn.cursor()
-        c.execute('''CREATE TABLE IF NOT EXISTS submissions (
-            username TEXT,
-            question TEXT,
-            submitted INTEGER,
-            start_time REAL,
-            PRIMARY KEY (username, question)
-        )''')
-        c.execute('CREATE INDEX IF NOT EXISTS idx_username ON submissions (username)')
-        c.execute('CREATE INDEX IF NOT EXISTS idx_question ON submissions (question)')
-        conn.commit()
@@ -0,0 +1,110 @@
+"""
+Session Store for School Hackathon
+Snapshots, fresh sessions and restores of the submissions database and directory.
+Compatible with Python 3.10+
+"""
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+
+
+class SessionStore:
+    def __init__(self, qm, archive_dir):
+        self.qm = qm
+        self.archive_dir = archive_dir
+        # Serialises admin operations; live requests never take this lock
+        self.lock = threading.Lock()
+        os.makedirs(self.archive_dir, exist_ok=True)
+
+    def _snapshot_dir(self, name):
+        return os.path.join(self.archive_dir, name)
+
+    def list_snapshots(self):
+        snapshots = []
+        for entry in os.scandir(self.archive_dir):
+            meta_path = os.path.join(entry.path, 'meta.json')
+            if entry.is_dir() and os.path.exists(meta_path):
+                with open(meta_path, 'r') as f:
+                    snapshots.append(json.load(f))
+        return sorted(snapshots, key=lambda m: m['created'], reverse=True)
+
+    @staticmethod
+    def _backup_db(src_path, dest_path):
+        # The online backup API copies a consistent image while writers keep going
+        with sqlite3.connect(src_path) as src, sqlite3.connect(dest_path) as dest:
+            src.backup(dest, pages=256)
+
+    def snapshot(self, name):
+        """Archive the live database and submission files under `name`."""
+        with self.lock:
+            dest = self._snapshot_dir(name)
+            if os.path.exists(dest):
+                raise ValueError(f"Snapshot '{name}' already exists")
+            os.makedirs(dest)
+            self._backup_db(self.qm.db_path, os.path.join(dest, 'submissions.db'))
+            if os.path.exists(self.qm.submissions_dir):
+                shutil.copytree(self.qm.submissions_dir, os.path.join(dest, 'submissions'))
+            else:
+                os.makedirs(os.path.join(dest, 'submissions'))
+            meta = {'name': name, 'created': time.time()}
+            with open(os.path.join(dest, 'meta.json'), 'w') as f:
+                json.dump(meta, f)
+            return meta
+
+    def new_session(self):
+        """Swap in an empty database and submissions directory."""
+        with self.lock:
+            staged_db, staged_dir = self._staging_paths()
+            self.qm._init_db(staged_db)
+            os.makedirs(staged_dir)
+            self._swap(staged_db, staged_dir)
+
+    def restore(self, name):
+        """Swap in the database and submission files of snapshot `name`."""
+        with self.lock:
+            src = self._snapshot_dir(name)
+            if not os.path.exists(os.path.join(src, 'meta.json')):
+                raise ValueError(f"Snapshot '{name}' not found")
+            staged_db, staged_dir = self._staging_paths()
+            self._backup_db(os.path.join(src, 'submissions.db'), staged_db)
+            # Bring older snapshots up to the current schema before they go live
+            self.qm._init_db(staged_db)
+            shutil.copytree(os.path.join(src, 'submissions'), staged_dir)
+            self._swap(staged_db, staged_dir)
+
+    def _staging_paths(self):
+        staged_db = self.qm.db_path + '.staged'
+        staged_dir = self.qm.submissions_dir + '.staged'
+        if os.path.exists(staged_db):
+            os.remove(staged_db)
+        if os.path.exists(staged_dir):
+            shutil.rmtree(staged_dir)
+        return staged_db, staged_dir
+
+    def _swap(self, staged_db, staged_dir):
+        # Everything slow happened while staging; the swap itself is two renames.
+        # Each query opens its own connection, so the next one sees the new file.
+        retired_dir = f"{self.qm.submissions_dir}.retired-{int(time.time() * 1000)}"
+        with self.qm.lock:
+            _replace(staged_db, self.qm.db_path)
+            if os.path.exists(self.qm.submissions_dir):
+                os.rename(self.qm.submissions_dir, retired_dir)
+            os.rename(staged_dir, self.qm.submissions_dir)
+            self.qm.generation += 1
+        # Delete the old files off the request path
+        threading.Thread(target=shutil.rmtree, args=(retired_dir, True), daemon=True).start()
+
+
+def _replace(src, dest, attempts=20):
+    # Windows refuses to replace a file another connection has open; retry briefly
+    for attempt in range(attempts):
+        try:
+            os.replace(src, dest)
+            return
+        except PermissionError:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(0.05)
@@ -0,0 +1,233 @@
+"""
+Similarity Engine for School Hackathon
+Flags copied answers with winnowed k-gram fingerprints over normalised Python tokens.
+Compatible with Python 3.10+
+"""
+import builtins
+import hashlib
+import io
+import json
+import keyword
+import logging
+import os
+import queue
+import re
+import subprocess
+import sys
+import threading
+import tokenize
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+K = 5            # tokens per k-gram
+WINDOW = 4       # k-grams per winnowing window
+MAX_BYTES = 200 * 1024
+# Only worth paying process start-up for a bulk scan
+POOL_THRESHOLD = 32
+
+_KEEP_NAMES = set(keyword.kwlist) | set(dir(builtins))
+_SKIP_TOKENS = {tokenize.COMMENT, tokenize.NL, tokenize.ENCODING, tokenize.ENDMARKER}
+_FALLBACK_TOKEN = re.compile(r'[A-Za-z_]\w*|\d+|\S')
+
+
+def normalize_tokens(source):
+    """Tokenise source, renaming identifiers and literals so renaming variables does not hide a copy."""
+    tokens = []
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(source).readline):
+            if tok.type in _SKIP_TOKENS:
+                continue
+            if tok.type == tokenize.NAME:
+                tokens.append(tok.string if tok.string in _KEEP_NAMES else 'ID')
+            elif tok.type == tokenize.NUMBER:
+                tokens.append('N')
+            elif tok.type == tokenize.STRING:
+                tokens.append('S')
+            elif tok.type == tokenize.INDENT:
+                tokens.append('>')
+            elif tok.type == tokenize.DEDENT:
+                tokens.append('<')
+            elif tok.type == tokenize.NEWLINE:
+                tokens.append(';')
+            else:
+                tokens.append(tok.string)
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        # Not valid Python; fall back to a crude lexer so it is still compared
+        tokens = ['ID' if t[0].isalpha() and t not in _KEEP_NAMES else t
+                  for t in _FALLBACK_TOKEN.findall(source)]
+    return tokens
+
+
+def winnow(tokens, k=K, window=WINDOW):
+    """Return the winnowed fingerprint set of a token list."""
+    # crc32 rather than hash(): results must agree across worker processes
+    hashes = [zlib.crc32('\x1f'.join(tokens[i:i + k]).encode('utf-8')) for i in range(len(tokens) - k + 1)]
+    if len(hashes) <= window:
+        return frozenset(hashes)
+    selected = set()
+    for i in range(len(hashes) - window + 1):
+        win = hashes[i:i + window]
+        # Rightmost minimum, as in the winnowing paper
+        selected.add(min(reversed(win)))
+    return frozenset(selected)
+
+
+def fingerprint_source(source):
+    return winnow(normalize_tokens(source))
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def fingerprint_many(sources):
+    """Fingerprint a bulk scan with a process pool run from this module in a child interpreter.
+
+    Spawned pool workers re-import the parent's __main__; when that is server.py every worker
+    would repeat the server's start-up (reconciler, replicator, samplers). Running the pool from
+    `python similarity.py` keeps the re-imported main module free of side effects.
+    """
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__)], input=json.dumps(sources),
+                          capture_output=True, text=True, encoding='utf-8', check=True)
+    return [frozenset(fps) for fps in json.loads(proc.stdout)]
+
+
+class SimilarityEngine:
+    def __init__(self, submissions_dir, questions, min_score=0.5, max_df=0.5, min_docs=20):
+        self.submissions_dir = submissions_dir
+        self.questions = list(questions)
+        self.min_score = min_score
+        # Fingerprints shared by more than this fraction of a question's submissions are boilerplate,
+        # but only once there are min_docs submissions; below that a copy ring could be the majority
+        self.max_df = max_df
+        self.min_docs = min_docs
+        self.lock = threading.Lock()
+        self.cache = {}        # content hash -> fingerprints
+        self.docs = {}         # qname -> {username: fingerprints}
+        self.inverted = {}     # qname -> {fingerprint: set(usernames)}
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='similarity', daemon=True)
+
+    def start(self):
+        if not self._thread.is_alive():
+            self._thread.start()
+        return self
+
+    # --- Indexing ---
+    def _path(self, username, qname):
+        return os.path.join(self.submissions_dir, username, f"{qname}.py")
+
+    def _read(self, path):
+        with open(path, 'rb') as f:
+            return f.read(MAX_BYTES)
+
+    def _add(self, username, qname, fps):
+        with self.lock:
+            docs = self.docs.setdefault(qname, {})
+            inverted = self.inverted.setdefault(qname, {})
+            for fp in docs.pop(username, ()):
+                users = inverted.get(fp)
+                if users:
+                    users.discard(username)
+                    if not users:
+                        del inverted[fp]
+            if not fps:
+                return
+            docs[username] = fps
+            for fp in fps:
+                inverted.setdefault(fp, set()).add(username)
+
+    def index_file(self, username, qname, path=None):
+        data = self._read(path or self._path(username, qname))
+        digest = content_hash(data)
+        fps = self.cache.get(digest)
+        if fps is None:
+            fps = self.cache[digest] = fingerprint_source(data.decode('utf-8', 'replace'))
+        self._add(username, qname, fps)
+
+    def enqueue(self, username, qname, path=None):
+        """Index a new submission on the background thread."""
+        self._queue.put((username, qname, path))
+
+    def rescan(self):
+        """Rebuild the index from the submissions directory (e.g. after a session swap)."""
+        self._queue.put(None)
+
+    def _scan_all(self):
+        pending = []
+        if os.path.exists(self.submissions_dir):
+            for user_entry in os.scandir(self.submissions_dir):
+                if not user_entry.is_dir():
+                    continue
+                for qname in self.questions:
+                    path = os.path.join(user_entry.path, f"{qname}.py")
+                    if os.path.exists(path):
+                        data = self._read(path)
+                        pending.append((user_entry.name, qname, content_hash(data), data))
+        with self.lock:
+            self.docs.clear()
+            self.inverted.clear()
+
+        uncached = {digest: data for _, _, digest, data in pending if digest not in self.cache}
+        sources = [data.decode('utf-8', 'replace') for data in uncached.values()]
+        if len(sources) >= POOL_THRESHOLD:
+            try:
+                results = fingerprint_many(sources)
+            except Exception as e:
+                logging.error(f"Similarity process pool failed, scanning serially: {e}")
+                results = [fingerprint_source(src) for src in sources]
+        else:
+            results = [fingerprint_source(src) for src in sources]
+        self.cache.update(zip(uncached.keys(), results))
+
+        for username, qname, digest, _ in pending:
+            self._add(username, qname, self.cache[digest])
+
+    def _run(self):
+        self._scan_all()
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    self._scan_all()
+                else:
+                    self.index_file(*item)
+            except Exception as e:
+                logging.error(f"Similarity indexing failed for {item}: {e}")
+
+    # --- Reporting ---
+    def pairs(self, qname, limit=50):
+        """Return (score, user_a, user_b, shared) tuples for qname, most similar first."""
+        with self.lock:
+            docs = dict(self.docs.get(qname, {}))
+            inverted = self.inverted.get(qname, {})
+            boilerplate = set()
+            if len(docs) >= self.min_docs:
+                max_users = max(2, int(len(docs) * self.max_df))
+                boilerplate = {fp for fp, users in inverted.items() if len(users) > max_users}
+            shared = {}
+            for fp, users in inverted.items():
+                if len(users) < 2 or fp in boilerplate:
+                    continue
+                ordered = sorted(users)
+                for i, a in enumerate(ordered):
+                    for b in ordered[i + 1:]:
+                        shared[(a, b)] = shared.get((a, b), 0) + 1
+        results = []
+        for (a, b), count in shared.items():
+            # Boilerplate is left out of both sides of the Jaccard score
+            score = count / len((docs[a] | docs[b]) - boilerplate)
+            if score >= self.min_score:
+                results.append((round(score, 3), a, b, count))
+        results.sort(reverse=True)
+        return results[:limit]
+
+    def report(self, limit=50):
+        return {qname: self.pairs(qname, limit) for qname in self.questions}
+
+
+if __name__ == '__main__':
+    # Worker entry point for fingerprint_many: JSON list of sources in, fingerprint lists out
+    with ProcessPoolExecutor() as pool:
+        fingerprints = pool.map(fingerprint_source, json.load(sys.stdin), chunksize=8)
+        json.dump([sorted(fps) for fps in fingerprints], sys.stdout)
@@ -0,0 +1,126 @@
+/*
+ * Minimal Socket.IO client for the admin dashboard.
+ * Speaks Engine.IO v4 long-polling and the Socket.IO v5 packet format used by
+ * python-socketio 5.x / python-engineio 4.x, text events only. Served from /static
+ * so the dashboard works on an offline exam network and runs no third-party code.
+ * Exposes io(namespace) with .on(event, fn) like the official client, including the
+ * 'connect', 'disconnect' and 'connect_error' events.
+ */
+(function(global){
+    var SEP = '\x1e';               // Engine.IO v4 payload record separator
+    var RETRY_MS = 3000;
+
+    function Socket(namespace){
+        this.nsp = namespace || '/';
+        this.handlers = {};
+        this.sid = null;
+        this.connected = false;
+        this.open();
+    }
+
+    Socket.prototype.on = function(event, fn){
+        (this.handlers[event] = this.handlers[event] || []).push(fn);
+        return this;
+    };
+
+    Socket.prototype.fire = function(event, args){
+        (this.handlers[event] || []).forEach(function(fn){ fn.apply(null, args); });
+    };
+
+    Socket.prototype.url = function(){
+        var url = '/socket.io/?EIO=4&transport=polling&t=' + Date.now().toString(36);
+        return this.sid ? url + '&sid=' + encodeURIComponent(this.sid) : url;
+    };
+
+    Socket.prototype.prefix = function(){
+        return this.nsp === '/' ? '' : this.nsp + ',';
+    };
+
+    Socket.prototype.post = function(packet){
+        return fetch(this.url(), {
+            method: 'POST', body: packet, credentials: 'same-origin',
+            headers: { 'Content-Type': 'text/plain;charset=UTF-8' }
+        });
+    };
+
+    Socket.prototype.open = function(){
+        var self = this;
+        self.sid = null;
+        fetch(self.url(), { credentials: 'same-origin' })
+            .then(function(r){ if (!r.ok) throw new Error('handshake ' + r.status); return r.text(); })
+            .then(function(body){
+                var first = body.split(SEP)[0];
+                if (first.charAt(0) !== '0') throw new Error('unexpected handshake');
+                self.sid = JSON.parse(first.slice(1)).sid;
+                // Engine.IO message (4) carrying a Socket.IO CONNECT (0) for the namespace
+                return self.post('40' + self.prefix());
+            })
+            .then(function(){ self.poll(); })
+            .catch(function(err){ self.fail(err); });
+    };
+
+    Socket.prototype.fail = function(err){
+        var self = this;
+        if (self.connected) {
+            self.connected = false;
+            self.fire('disconnect', ['transport error']);
+        } else {
+            self.fire('connect_error', [err]);
+        }
+        self.sid = null;
+        setTimeout(function(){ self.open(); }, RETRY_MS);
+    };
+
+    Socket.prototype.poll = function(){
+        var self = this;
+        fetch(self.url(), { credentials: 'same-origin' })
+            .then(function(r){ if (!r.ok) throw new Error('poll ' + r.status); return r.text(); })
+            .then(function(body){
+                var alive = true;
+                body.split(SEP).forEach(function(packet){
+                    if (alive && packet) alive = self.receive(packet);
+                });
+                if (alive) self.poll();
+            })
+            .catch(function(err){ self.fail(err); });
+    };
+
+    // Handle one Engine.IO packet; returns false once the session is over
+    Socket.prototype.receive = function(packet){
+        var type = packet.charAt(0);
+        if (type === '2') {                     // ping -> pong
+            this.post('3');
+        } else if (type === '1') {              // server closed the session
+            this.fail(new Error('closed'));
+            return false;
+        } else if (type === '4') {
+            this.message(packet.slice(1));
+        }
+        return true;
+    };
+
+    // Socket.IO packet: <type>[<namespace>,][<json>]
+    Socket.prototype.message = function(data){
+        var type = data.charAt(0);
+        var rest = data.slice(1);
+        var prefix = this.prefix();
+        if (prefix) {
+            if (rest.indexOf(prefix) !== 0) return;
+            rest = rest.slice(prefix.length);
+        }
+        if (type === '0') {
+            this.connected = true;
+            this.fire('connect', []);
+        } else if (type === '4') {
+            this.fire('connect_error', [JSON.parse(rest || '{}')]);
+        } else if (type === '1') {
+            this.connected = false;
+            this.fire('disconnect', ['io server disconnect']);
+        } else if (type === '2') {
+            var args = JSON.parse(rest.replace(/^\d+/, ''));  // drop an ack id if present
+            this.fire(args[0], args.slice(1));
+        }
+    };
+
+    global.io = function(namespace){ return new Socket(namespace); };
+})(window);
@@ -0,0 +1,81 @@
+"""
+Stats Collector for School Hackathon
+Samples system statistics on one background thread and shares them with every admin client.
+Compatible with Python 3.10+
+"""
+import os
+import threading
+import time
+from collections import deque
+
+import psutil
+
+
+class StatsCollector:
+    def __init__(self, db_path, session_count=None, emit=None, interval=5.0, history=60):
+        # db_path may be a callable so the collector follows the live database file
+        self.db_path = db_path
+        self.session_count = session_count
+        self.emit = emit
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.samples = deque(maxlen=history)
+        self.process = psutil.Process()
+        # The first cpu_percent() call only primes the counters
+        psutil.cpu_percent(interval=None)
+        self._thread = threading.Thread(target=self._run, name='stats-collector', daemon=True)
+
+    def start(self):
+        if not self._thread.is_alive():
+            self._thread.start()
+        return self
+
+    def _db_size(self):
+        path = self.db_path() if callable(self.db_path) else self.db_path
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def _open_files(self):
+        # num_fds() is POSIX only; Windows exposes handles instead
+        try:
+            return self.process.num_fds()
+        except AttributeError:
+            return self.process.num_handles()
+
+    def sample(self):
+        """Take one measurement and append it to the history."""
+        sample = {
+            'ts': time.time(),
+            'cpu': psutil.cpu_percent(interval=None),
+            'ram': psutil.virtual_memory().percent,
+            'rss': self.process.memory_info().rss,
+            'fds': self._open_files(),
+            'threads': self.process.num_threads(),
+            'sockets': self.session_count() if self.session_count else 0,
+            'db_size': self._db_size(),
+        }
+        with self.lock:
+            self.samples.append(sample)
+        return sample
+
+    def latest(self):
+        with self.lock:
+            if self.samples:
+                return dict(self.samples[-1])
+        return self.sample()
+
+    def history(self):
+        with self.lock:
+            return [dict(s) for s in self.samples]
+
+    def _run(self):
+        while True:
+            try:
+                sample = self.sample()
+                if self.emit:
+                    self.emit(sample)
+            except Exception:
+                pass
+            time.sleep(self.interval)
@@ -0,0 +1,128 @@
+"""
+Submission Index for School Hackathon
+In-memory presence/size/mtime index of submission files, reconciled with the database in the background.
+Compatible with Python 3.10+
+"""
+import logging
+import os
+import threading
+import time
+
+
+class SubmissionIndex:
+    def __init__(self, qm, rescan_interval=120.0, batch_size=100, batch_pause=0.05):
+        self.qm = qm
+        self.rescan_interval = rescan_interval
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.lock = threading.Lock()
+        self.entries = {}       # (username, qname) -> (size, mtime)
+        self.mismatches = []    # latest reconciliation findings for the admin page
+        self.last_reconcile = None
+        self.build()
+        self._thread = threading.Thread(target=self._run, name='submission-index', daemon=True)
+
+    def start(self):
+        if not self._thread.is_alive():
+            self._thread.start()
+        return self
+
+    def _scan(self):
+        """Walk the submissions directory once with scandir."""
+        entries = {}
+        wanted = {f"{q}.py": q for q in self.qm.timers}
+        try:
+            users = list(os.scandir(self.qm.submissions_dir))
+        except FileNotFoundError:
+            return entries
+        for user_entry in users:
+            if not user_entry.is_dir():
+                continue
+            try:
+                files = list(os.scandir(user_entry.path))
+            except FileNotFoundError:
+                continue
+            for entry in files:
+                qname = wanted.get(entry.name)
+                if qname and entry.is_file():
+                    st = entry.stat()
+                    entries[(user_entry.name, qname)] = (st.st_size, st.st_mtime)
+        return entries
+
+    def build(self):
+        """Replace the index with a fresh scan (startup and after a session swap)."""
+        entries = self._scan()
+        with self.lock:
+            self.entries = entries
+            self.mismatches = []
+
+    def record(self, username, qname):
+        """Called from the submit path once the file is in place."""
+        path = os.path.join(self.qm.submissions_dir, username, f"{qname}.py")
+        st = os.stat(path)
+        with self.lock:
+            self.entries[(username, qname)] = (st.st_size, st.st_mtime)
+
+    def has(self, username, qname):
+        with self.lock:
+            return (username, qname) in self.entries
+
+    def present(self):
+        with self.lock:
+            return set(self.entries)
+
+    def reconcile(self):
+        """Rescan disk, refresh the index and repair the database in small batches."""
+        started = time.time()
+        # A session swap during the scan makes it describe the retired tree; drop it then
+        generation = self.qm.generation
+        disk = self._scan()
+        with self.lock:
+            if self.qm.generation != generation:
+                return []
+            # Keep anything recorded by the submit path while the scan was running
+            for key, value in self.entries.items():
+                if value[1] >= started:
+                    disk.setdefault(key, value)
+            self.entries = disk
+        submitted = self.qm.get_submitted_pairs()
+
+        # A file without a submitted row means the DB write was lost; the file wins
+        missing_rows = sorted(set(disk) - submitted)
+        for i in range(0, len(missing_rows), self.batch_size):
+            batch = missing_rows[i:i + self.batch_size]
+            if not self.qm.mark_submitted([(u, q, disk[(u, q)][1]) for u, q in batch], generation):
+                return []
+            time.sleep(self.batch_pause)
+
+        # A submitted row without a file cannot be repaired here; report it
+        missing_files = sorted(submitted - set(disk))
+        mismatches = [{'username': u, 'question': q, 'problem': 'repaired: file on disk, DB row was not submitted'}
+                      for u, q in missing_rows]
+        mismatches += [{'username': u, 'question': q, 'problem': 'marked submitted but file is missing'}
+                       for u, q in missing_files]
+        with self.lock:
+            if self.qm.generation != generation:
+                return []
+            self.mismatches = mismatches
+            self.last_reconcile = time.time()
+        if mismatches:
+            logging.error(f"Submission reconciliation: {len(missing_rows)} repaired, {len(missing_files)} files missing")
+        return mismatches
+
+    def get_mismatches(self):
+        with self.lock:
+            return list(self.mismatches)
+
+    def _run(self):
+        # Lower this thread's scheduling priority where the OS allows per-thread nice values
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+        except (AttributeError, OSError):
+            pass
+        while True:
+            try:
+                self.reconcile()
+            except Exception as e:
+                logging.error(f"Submission reconciliation failed: {e}")
+            time.sleep(self.rescan_interval)
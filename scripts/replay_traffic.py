@@ -0,0 +1,248 @@
+"""
+Traffic Replay for School Hackathon
+Rebuilds per-client request timelines from server logs (app/logs/server.log, and the
+timestamped request lines that also land in app/logs/errors.log) and replays them against a
+local instance, keeping (or compressing) the original inter-arrival times.
+Compatible with Python 3.10+
+
+Usage:
+    python scripts/replay_traffic.py app/logs/server.log --dump
+    python scripts/replay_traffic.py app/logs/server.log --base-url http://localhost:5000 --speed 4
+
+All replayed clients share this machine's IP, so the per-IP admission buckets see a single
+client; start the server with ADMISSION_ENABLED=0 (or a large ADMISSION_IP_BURST) unless that
+is what you want to measure.
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import re
+import ssl
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from datetime import datetime
+
+ANSI = re.compile(r'\x1b\[[0-9;]*m')
+# Optional logging prefix: "2025-10-07 13:45:34,987 - INFO - "
+PREFIX = re.compile(r'^(?P<logts>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) - \w+ - ')
+# Werkzeug access line: 127.0.0.1 - - [04/Oct/2025 10:42:16] "GET /path?x=1 HTTP/1.1" 200 -
+ACCESS = re.compile(r'^(?P<ip>\S+) - - \[(?P<ts>[^\]]+)\] "(?P<method>[A-Z]+) (?P<path>\S+) HTTP/[\d.]+" (?P<status>\d{3})')
+# log_request_info line: HTTP REQUEST: GET /path from 1.2.3.4 UA=...
+APP_REQUEST = re.compile(r'^HTTP REQUEST: (?P<method>[A-Z]+) (?P<path>\S+) from (?P<ip>\S+) UA=(?P<ua>.*)$')
+
+SESSION_IDLE = 30 * 60   # a client silent for this long starts a new timeline
+AUTHENTICATED = ('/dashboard', '/question', '/review', '/start_test', '/student/', '/admin', '/logout')
+
+
+def parse_log(path, source='auto'):
+    """Return a list of request dicts sorted by time.
+
+    source: 'access' uses Werkzeug access lines (keep query strings, 1s resolution),
+    'app' uses log_request_info lines (millisecond timestamps and user agent, no query string),
+    'auto' picks access lines when the log has any.
+    """
+    access, app = [], []
+    recent = []
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for raw in f:
+            line = ANSI.sub('', raw.rstrip('\r\n'))
+            prefix = PREFIX.match(line)
+            if prefix:
+                # Records logged through two handlers appear twice with the same millisecond stamp
+                if line in recent:
+                    continue
+                recent = (recent + [line])[-8:]
+                logts = datetime.strptime(prefix.group('logts'), '%Y-%m-%d %H:%M:%S,%f').timestamp()
+                line = line[prefix.end():]
+            else:
+                logts = None
+            m = ACCESS.match(line)
+            if m:
+                ts = logts or datetime.strptime(m.group('ts'), '%d/%b/%Y %H:%M:%S').timestamp()
+                access.append({'ts': ts, 'client': m.group('ip'), 'method': m.group('method'),
+                               'path': m.group('path'), 'status': int(m.group('status'))})
+                continue
+            m = APP_REQUEST.match(line)
+            if m and logts is not None:
+                app.append({'ts': logts, 'client': f"{m.group('ip')}|{m.group('ua')}", 'method': m.group('method'),
+                            'path': m.group('path'), 'status': None})
+    if source == 'app' or (source == 'auto' and not access):
+        requests = app
+    else:
+        requests = access
+    return sorted(requests, key=lambda r: r['ts'])
+
+
+def build_timelines(requests):
+    """Group requests into per-client timelines, splitting on long idle gaps."""
+    open_sessions, timelines = {}, []
+    for req in requests:
+        timeline = open_sessions.get(req['client'])
+        if timeline is None or req['ts'] - timeline[-1]['ts'] > SESSION_IDLE:
+            timeline = open_sessions[req['client']] = []
+            timelines.append(timeline)
+        timeline.append(req)
+    return timelines
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    # The log already holds the follow-up request; time each response on its own
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class Replayer:
+    def __init__(self, base_url, credentials, speed=1.0, max_gap=None, insecure=False, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.credentials = credentials
+        self.speed = speed
+        self.max_gap = max_gap
+        self.timeout = timeout
+        self.ssl_context = ssl._create_unverified_context() if insecure else None
+        self.lock = threading.Lock()
+        self.results = []   # (method, route, status, seconds)
+
+    def _opener(self):
+        handlers = [urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), NoRedirect()]
+        if self.ssl_context:
+            handlers.append(urllib.request.HTTPSHandler(context=self.ssl_context))
+        return urllib.request.build_opener(*handlers)
+
+    def _request(self, opener, method, path, credentials):
+        data, headers = None, {}
+        if method == 'POST' and path.split('?')[0] == '/':
+            data = urllib.parse.urlencode({'username': credentials[0], 'password': credentials[1]}).encode()
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        elif method == 'POST' and path.startswith('/question'):
+            boundary = uuid.uuid4().hex
+            data = (f'--{boundary}\r\nContent-Disposition: form-data; name="answer"; filename="replay.py"\r\n'
+                    f'Content-Type: text/x-python\r\n\r\nprint("replay")\r\n--{boundary}--\r\n').encode()
+            headers['Content-Type'] = f'multipart/form-data; boundary={boundary}'
+        elif method == 'POST':
+            data = b''
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        started = time.perf_counter()
+        try:
+            with opener.open(req, timeout=self.timeout) as resp:
+                resp.read()
+                status = resp.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except (urllib.error.URLError, OSError):
+            status = 0
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            self.results.append((method, path.split('?')[0], status, elapsed))
+
+    def _gap(self, seconds):
+        if self.max_gap is not None:
+            seconds = min(seconds, self.max_gap)
+        return seconds / self.speed
+
+    def replay_timeline(self, timeline, credentials):
+        opener = self._opener()
+        # Sessions captured mid-way (no login line) still need a session cookie
+        first_login = next((i for i, r in enumerate(timeline) if r['method'] == 'POST' and r['path'] == '/'), None)
+        needs_auth = any(r['path'].startswith(AUTHENTICATED) for r in timeline[:first_login])
+        if needs_auth:
+            self._request(opener, 'POST', '/', credentials)
+        # Requests keep their offsets from the timeline start; a slow response delays only
+        # requests that were due while it was outstanding, as a real browser would
+        started, offset, previous = time.monotonic(), 0.0, timeline[0]['ts']
+        for req in timeline:
+            offset += self._gap(req['ts'] - previous)
+            previous = req['ts']
+            time.sleep(max(0.0, started + offset - time.monotonic()))
+            self._request(opener, req['method'], req['path'], credentials)
+
+    def run(self, timelines):
+        # One thread per timeline, started at the timeline's own offset, so no client waits for
+        # another to finish and the original arrival pattern is kept however many overlap
+        origin = min(t[0]['ts'] for t in timelines)
+        now = time.monotonic()
+        threads = []
+        for i, timeline in sorted(enumerate(timelines), key=lambda it: it[1][0]['ts']):
+            time.sleep(max(0.0, now + self._gap(timeline[0]['ts'] - origin) - time.monotonic()))
+            thread = threading.Thread(target=self.replay_timeline, daemon=True,
+                                      args=(timeline, self.credentials[i % len(self.credentials)]))
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+        return self.results
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def print_report(results, wall):
+    print(f"{len(results)} requests in {wall:.1f}s")
+    routes = {}
+    for method, route, status, elapsed in results:
+        routes.setdefault((method, route), []).append((status, elapsed))
+    print(f"{'route':32} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses")
+    for (method, route), rows in sorted(routes.items(), key=lambda kv: -len(kv[1])):
+        times = [e * 1000 for _, e in rows]
+        statuses = {}
+        for status, _ in rows:
+            statuses[status] = statuses.get(status, 0) + 1
+        print(f"{method + ' ' + route:32} {len(rows):6} {percentile(times, 50):8.1f} {percentile(times, 95):8.1f}"
+              f" {percentile(times, 99):8.1f}  {statuses}")
+
+
+def load_credentials(logins_path):
+    with open(logins_path, 'r') as f:
+        logins = json.load(f)
+    return [(s['username'], s['password']) for s in logins.get('students', [])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay server.log traffic against a local instance.')
+    parser.add_argument('logs', nargs='+', help='log files to read')
+    parser.add_argument('--base-url', default='http://localhost:5000')
+    parser.add_argument('--source', choices=['auto', 'access', 'app'], default='auto')
+    parser.add_argument('--speed', type=float, default=1.0, help='divide inter-arrival times by this factor')
+    parser.add_argument('--max-gap', type=float, default=None, help='cap any single idle gap (seconds, before --speed)')
+    parser.add_argument('--logins', default=os.path.join('app', 'logins.json'), help='student credentials to log in with')
+    parser.add_argument('--insecure', action='store_true', help='accept the self-signed certificate')
+    parser.add_argument('--dump', action='store_true', help='print the timelines instead of replaying them')
+    args = parser.parse_args()
+
+    requests = []
+    for path in args.logs:
+        requests.extend(parse_log(path, args.source))
+    requests.sort(key=lambda r: r['ts'])
+    timelines = build_timelines(requests)
+    if not timelines:
+        print('No requests found.')
+        return 1
+
+    if args.dump:
+        for timeline in timelines:
+            start = timeline[0]['ts']
+            print(f"# {timeline[0]['client']} ({len(timeline)} requests)")
+            for req in timeline:
+                print(f"  +{req['ts'] - start:8.3f}s {req['method']:5} {req['path']} -> {req['status']}")
+        return 0
+
+    credentials = load_credentials(args.logins)
+    if not credentials:
+        print(f"No student logins in {args.logins}")
+        return 1
+    replayer = Replayer(args.base_url, credentials, speed=args.speed, max_gap=args.max_gap, insecure=args.insecure)
+    started = time.monotonic()
+    results = replayer.run(timelines)
+    print_report(results, time.monotonic() - started)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,44 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'app'))
+import migrations
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    # question_manager opens app/logs/errors.log relative to the working directory on import
+    monkeypatch.chdir(ROOT)
+    from question_manager import QuestionManager
+    return QuestionManager
+
+
+def test_query_plans_have_no_unexpected_full_scans(tmp_path, queries):
+    with sqlite3.connect(str(tmp_path / 'check.db')) as conn:
+        migrations.migrate(conn)
+        assert migrations.check_query_plans(conn, queries.QUERIES, queries.FULL_SCAN_QUERIES) == {}
+
+
+def test_checker_reports_a_full_scan(tmp_path):
+    with sqlite3.connect(str(tmp_path / 'check.db')) as conn:
+        migrations.migrate(conn)
+        sql = "SELECT * FROM student_events WHERE event = 1"
+        assert list(migrations.check_query_plans(conn, {'unindexed': sql})) == ['unindexed']
+
+
+def test_failed_migration_rolls_back_completely(tmp_path, monkeypatch):
+    bad = (99, 'half applied', [
+        'CREATE TABLE half_applied (x INTEGER)',
+        'CREATE INDEX idx_missing ON no_such_table (x)',
+    ])
+    monkeypatch.setattr(migrations, 'MIGRATIONS', migrations.MIGRATIONS + [bad])
+    with sqlite3.connect(str(tmp_path / 'check.db')) as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            migrations.migrate(conn)
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        assert 'half_applied' not in tables
+        assert migrations.current_version(conn) == migrations.MIGRATIONS[-2][0]
@@ -0,0 +1,58 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+from similarity import SimilarityEngine
+
+COPIED = """
+def solve(numbers):
+    total = 0
+    for n in numbers:
+        if n % 2 == 0:
+            total += n * n
+    return total
+
+print(solve([int(x) for x in input().split()]))
+"""
+
+OTHER = """
+import math
+word = input().strip()
+counts = {}
+for ch in word:
+    counts[ch] = counts.get(ch, 0) + 1
+best = max(counts, key=counts.get)
+print(best, counts[best], math.sqrt(len(word)))
+"""
+
+
+def make_engine(tmp_path, sources, **kwargs):
+    for user, source in sources.items():
+        (tmp_path / user).mkdir()
+        (tmp_path / user / 'question1.py').write_text(source)
+    engine = SimilarityEngine(str(tmp_path), ['question1'], **kwargs)
+    engine._scan_all()
+    return engine
+
+
+def test_clique_of_all_submissions_is_flagged(tmp_path):
+    engine = make_engine(tmp_path, {'a': COPIED, 'b': COPIED, 'c': COPIED})
+    pairs = engine.pairs('question1')
+    assert {(a, b) for _, a, b, _ in pairs} == {('a', 'b'), ('a', 'c'), ('b', 'c')}
+    assert all(score == 1.0 for score, _, _, _ in pairs)
+
+
+def test_majority_clique_with_an_unrelated_submission(tmp_path):
+    engine = make_engine(tmp_path, {'a': COPIED, 'b': COPIED, 'c': COPIED, 'd': OTHER})
+    pairs = engine.pairs('question1')
+    assert {(a, b) for _, a, b, _ in pairs} == {('a', 'b'), ('a', 'c'), ('b', 'c')}
+
+
+def test_boilerplate_is_left_out_of_both_sides(tmp_path):
+    # With max_df active, fingerprints in every submission are boilerplate; the copied
+    # pair still scores 1.0 because the boilerplate is removed from the union too
+    sources = {'a': COPIED + OTHER, 'b': COPIED + OTHER, 'c': OTHER}
+    engine = make_engine(tmp_path, sources, min_docs=3)
+    pairs = engine.pairs('question1')
+    assert [(a, b) for _, a, b, _ in pairs] == [('a', 'b')]
+    assert pairs[0][0] == 1.0